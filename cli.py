@@ -4,24 +4,162 @@ Anomaly Hunter CLI
 Simple command-line interface for anomaly detection
 """
 
+import argparse
 import asyncio
+import importlib.util
+import io
+import math
 import sys
+import threading
+import time
 import os
 import numpy as np
-import pandas as pd
-from pathlib import Path
-
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent / "src"))
-
-from orchestrator import AnomalyOrchestrator, AnomalyContext
-from integrations.stackai_gateway import StackAIGateway
-from integrations.sentry_monitoring import initialize_sentry, track_anomaly_detection
-from integrations.redpanda_streaming import RedpandaStreaming
-from integrations.senso_rag import SensoRAG
-from integrations.airia_workflows import AiriaWorkflows
-from integrations.truefoundry_deployment import TrueFoundryDeployment
-import time
+
+# Arrow's multithreaded CSV parser (optional; probed without importing it)
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+
+# Shell completion (optional)
+try:
+    import argcomplete
+    ARGCOMPLETE_AVAILABLE = True
+except ImportError:
+    ARGCOMPLETE_AVAILABLE = False
+
+# Sponsor clients and orchestrator shared by every detection on an event loop
+_clients = {}
+
+
+class _ThreadOutput:
+    """sys.stdout stand-in that buffers prints made inside capture() per thread"""
+
+    def __init__(self, stdout):
+        self.stdout = stdout
+        self._local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        return (self.stdout if buffer is None else buffer).write(text)
+
+    def __getattr__(self, name):
+        return getattr(self.stdout, name)
+
+    def capture(self, call):
+        """Return call()'s result together with everything it printed"""
+        self._local.buffer = buffer = io.StringIO()
+        try:
+            return call(), buffer.getvalue()
+        except BaseException:
+            self.stdout.write(buffer.getvalue())
+            raise
+        finally:
+            self._local.buffer = None
+
+
+async def _gather_in_threads(*calls):
+    """
+    Run blocking calls concurrently in worker threads
+
+    Their prints are held back and replayed in call order once all of them
+    finish, so status lines from different clients don't interleave.
+    """
+
+    output = sys.stdout = _ThreadOutput(sys.stdout)
+    try:
+        results = await asyncio.gather(*(asyncio.to_thread(output.capture, call) for call in calls))
+    finally:
+        sys.stdout = output.stdout
+
+    for _, printed in results:
+        sys.stdout.write(printed)
+    return [result for result, _ in results]
+
+
+async def _get_clients(sponsors: bool = True):
+    """
+    Return the sponsor clients for the running event loop, creating them once
+
+    Reusing the clients lets batch detection share one HTTP session and
+    producer instead of paying connection setup per file.
+
+    Args:
+        sponsors: Initialize sponsor integrations (False runs the agents
+            locally with only the orchestrator)
+    """
+
+    loop_id = id(asyncio.get_running_loop())
+    clients = _clients.get(loop_id)
+    if clients is not None:
+        return clients
+
+    # The orchestrator and sponsor integrations are imported here rather than
+    # at module level, so `help` and argument errors don't pay their import cost
+    from src.orchestrator import AnomalyOrchestrator
+
+    if not sponsors:
+        print("[INIT] Sponsor integrations disabled, running agents locally...")
+        clients = {"orchestrator": AnomalyOrchestrator(stackai_client=None)}
+        _clients[loop_id] = clients
+        return clients
+
+    from src.integrations.stackai_gateway import StackAIGateway
+    from src.integrations.sentry_monitoring import initialize_sentry
+    from src.integrations.redpanda_streaming import RedpandaStreaming
+    from src.integrations.senso_rag import SensoRAG
+    from src.integrations.airia_workflows import AiriaWorkflows
+    from src.integrations.truefoundry_deployment import TrueFoundryDeployment
+
+    # Initialize all sponsor integrations concurrently (each may block on network setup)
+    print("[INIT] Initializing sponsor integrations...")
+    initialize_sentry()  # Sentry monitoring
+    truefoundry, airia, senso, redpanda, stackai = await _gather_in_threads(
+        TrueFoundryDeployment,  # TrueFoundry ML platform
+        AiriaWorkflows,  # Airia data workflows
+        SensoRAG,  # Senso knowledge base
+        RedpandaStreaming,  # Redpanda event streaming
+        StackAIGateway  # StackAI model routing
+    )
+
+    # Create orchestrator
+    print("[INIT] Starting anomaly orchestrator...")
+    orchestrator = AnomalyOrchestrator(stackai_client=stackai)
+
+    clients = {
+        "truefoundry": truefoundry,
+        "airia": airia,
+        "senso": senso,
+        "redpanda": redpanda,
+        "stackai": stackai,
+        "orchestrator": orchestrator
+    }
+    _clients[loop_id] = clients
+    return clients
+
+
+async def _close_clients():
+    """Close the sponsor clients created for the running event loop"""
+
+    clients = _clients.pop(id(asyncio.get_running_loop()), None)
+    if clients is None or "stackai" not in clients:
+        return
+
+    await clients["stackai"].close()
+    clients["redpanda"].close()
+
+
+async def run_detection(data_paths, sponsors: bool = True):
+    """
+    Detect anomalies in one or more CSV files with shared sponsor clients
+
+    Args:
+        data_paths: Paths to CSV files with columns: timestamp, value
+        sponsors: Initialize sponsor integrations
+    """
+
+    try:
+        for data_path in data_paths:
+            await detect_command(data_path, sponsors)
+    finally:
+        await _close_clients()
 
 
 def print_banner():
@@ -32,65 +170,135 @@ def print_banner():
     print("="*70 + "\n")
 
 
-async def detect_command(data_path: str):
+async def detect_command(data_path: str, sponsors: bool = True):
     """
     Detect anomalies in CSV file
 
     Args:
         data_path: Path to CSV file with columns: timestamp, value
+        sponsors: Initialize sponsor integrations
     """
 
+    import pandas as pd
+
     print(f"[LOAD] Reading data from: {data_path}")
 
     try:
-        df = pd.read_csv(data_path)
+        # Values come from the .npy sidecar when there is one, so the CSV
+        # is only parsed for the remaining columns
+        data = _load_value_sidecar(data_path)
+        columns = ("timestamp",) if data is not None else ("value", "timestamp")
+
+        # Only materialize the columns detection uses (the pyarrow engine
+        # needs an explicit column list, so read the header first)
+        header = pd.read_csv(data_path, nrows=0).columns
+        df = pd.read_csv(
+            data_path,
+            usecols=[c for c in columns if c in header],
+            dtype={"value": np.float32, "timestamp": str},
+            engine=CSV_ENGINE
+        )
     except Exception as e:
         print(f"[ERROR] Failed to read CSV: {e}")
         return
 
-    # Validate columns
-    if "value" not in df.columns:
-        print("[ERROR] CSV must have 'value' column")
-        return
+    if data is None:
+        # Validate columns
+        if "value" not in df.columns:
+            print("[ERROR] CSV must have 'value' column")
+            return
+
+        data = df["value"].to_numpy(dtype=np.float32, copy=False)
 
-    data = df["value"].values
     timestamps = df["timestamp"].tolist() if "timestamp" in df.columns else None
 
     print(f"[OK] Loaded {len(data)} data points")
 
-    # Initialize all sponsor integrations
-    print("[INIT] Initializing sponsor integrations...")
-    initialize_sentry()  # Sentry monitoring
-    truefoundry = TrueFoundryDeployment()  # TrueFoundry ML platform
-    airia = AiriaWorkflows()  # Airia data workflows
-    senso = SensoRAG()  # Senso knowledge base
-    redpanda = RedpandaStreaming()  # Redpanda event streaming
-    stackai = StackAIGateway()  # StackAI model routing
+    await _run_detect(data, timestamps, data_path, sponsors)
+
+
+def _load_value_sidecar(data_path: str):
+    """
+    Memory-map the float32 values saved beside a generated CSV
+
+    Returns None when there is no .npy next to the CSV or the CSV has been
+    modified since it was written.
+    """
+
+    npy_path = os.path.splitext(data_path)[0] + ".npy"
+    if npy_path == data_path or not os.path.exists(npy_path):
+        return None
+    if os.path.getmtime(npy_path) < os.path.getmtime(data_path):
+        return None
 
-    # Preprocess data with Airia
-    print("[AIRIA] Preprocessing data...")
-    preprocessed = airia.preprocess_data(data)
-    quality = airia.validate_data_quality(data)
+    print(f"[LOAD] Using memory-mapped values from: {npy_path}")
+    return np.load(npy_path, mmap_mode="r")
+
+
+async def _run_detect(data: np.ndarray, timestamps, source: str, sponsors: bool = True):
+    """
+    Run the full detection pipeline on in-memory data
+
+    Args:
+        data: Data points to investigate
+        timestamps: Optional timestamps aligned with data
+        source: Data source label used in metadata and Senso queries
+        sponsors: Use sponsor integrations for preprocessing, context and publishing
+    """
 
-    # Retrieve historical context from Senso
-    print("[SENSO] Retrieving historical context...")
-    senso_context = senso.retrieve_context(f"Anomaly in {data_path}: mean={np.mean(data):.2f}, std={np.std(data):.2f}")
+    from src.orchestrator import AnomalyContext
+
+    clients = await _get_clients(sponsors)
+    orchestrator = clients["orchestrator"]
+    sponsors = "stackai" in clients
+
+    # Summary statistics, computed once (std reuses the mean instead of a second np.std pass)
+    mean = float(data.mean())
+    std = math.sqrt(float(np.square(data - mean).mean()))
+
+    if sponsors:
+        airia = clients["airia"]
+        senso = clients["senso"]
+
+        # Preprocess data with Airia and retrieve historical context from Senso
+        print("[AIRIA] Preprocessing data...")
+        print("[SENSO] Retrieving historical context...")
+        senso_query = f"Anomaly in {source}: mean={mean:.2f}, std={std:.2f}"
+        preprocessed, quality, senso_context = await _gather_in_threads(
+            lambda: airia.preprocess_data(data),
+            lambda: airia.validate_data_quality(data),
+            lambda: senso.retrieve_context(senso_query)
+        )
+
+        # Agents reuse these stats; fall back to Airia's if cleaning dropped points
+        if preprocessed['metadata']['removed_count'] > 0:
+            mean = preprocessed['metadata']['mean']
+            std = preprocessed['metadata']['std']
+
+        clean_data = preprocessed['data']
+        metadata = {
+            "source": source,
+            "quality_score": quality['quality_score'],
+            "preprocessing": preprocessed['metadata'],
+            "stats": (mean, std)
+        }
+    else:
+        # Minimal init: drop NaN/inf locally, no historical context
+        finite = np.isfinite(data)
+        clean_data = data if finite.all() else data[finite]
+        if len(clean_data) < len(data):
+            mean = float(clean_data.mean()) if len(clean_data) else 0.0
+            std = math.sqrt(float(np.square(clean_data - mean).mean())) if len(clean_data) else 0.0
+        senso_context = None
+        metadata = {"source": source, "stats": (mean, std)}
 
     # Create context
     context = AnomalyContext(
-        data=preprocessed['data'],
+        data=clean_data,
         timestamps=timestamps,
-        metadata={
-            "source": data_path,
-            "quality_score": quality['quality_score'],
-            "preprocessing": preprocessed['metadata']
-        }
+        metadata=metadata
     )
 
-    # Create orchestrator
-    print("[INIT] Starting anomaly orchestrator...")
-    orchestrator = AnomalyOrchestrator(stackai_client=stackai)
-
     # Run investigation with timing
     print("\n" + "-"*70)
     start_time = time.time()
@@ -111,30 +319,8 @@ async def detect_command(data_path: str):
     print(f"  {verdict.recommendation}")
     print("="*70)
 
-    # Track anomaly in Sentry
-    print("\n[SENTRY] Tracking anomaly event...")
-    track_anomaly_detection(verdict)
-
-    # Log to TrueFoundry
-    print("[TRUEFOUNDRY] Logging inference metrics...")
-    truefoundry.log_inference(verdict)
-    agent_timings = {f.agent_name: 1000 for f in verdict.agent_findings}  # Placeholder timings
-    truefoundry.log_performance(duration_ms, agent_timings)
-
-    # Publish to Redpanda stream
-    print("[REDPANDA] Publishing to event stream...")
-    redpanda.publish_anomaly_event(verdict)
-
-    # Store in Senso knowledge base
-    print("[SENSO] Storing in knowledge base...")
-    senso.store_anomaly(verdict)
-
-    # Generate voice alert for critical anomalies (severity >= 8)
-    if verdict.severity >= 8:
-        print("\n🔊 Generating voice alert for critical anomaly...")
-        from src.integrations.elevenlabs_voice import ElevenLabsVoice
-        voice = ElevenLabsVoice()
-        voice.generate_alert(verdict.summary, verdict.severity, verdict.confidence)
+    if sponsors:
+        await _publish_verdict(clients, verdict, duration_ms)
 
     # Agent details
     print("\n" + "="*70)
@@ -148,27 +334,71 @@ async def detect_command(data_path: str):
 
     print("\n" + "="*70)
 
-    # Cleanup
-    await stackai.close()
-    redpanda.close()
 
+async def _publish_verdict(clients, verdict, duration_ms: float):
+    """Publish a verdict to all sponsor sinks concurrently (independent I/O)"""
+
+    from src.integrations.sentry_monitoring import track_anomaly_detection
 
-def demo_command():
+    truefoundry = clients["truefoundry"]
+    senso = clients["senso"]
+    redpanda = clients["redpanda"]
+
+    agent_timings = {f.agent_name: 1000 for f in verdict.agent_findings}  # Placeholder timings
+    async with asyncio.TaskGroup() as tg:
+        # Track anomaly in Sentry
+        print("\n[SENTRY] Tracking anomaly event...")
+        tg.create_task(asyncio.to_thread(track_anomaly_detection, verdict))
+
+        # Log to TrueFoundry
+        print("[TRUEFOUNDRY] Logging inference metrics...")
+        tg.create_task(asyncio.to_thread(truefoundry.log_inference, verdict))
+        tg.create_task(asyncio.to_thread(truefoundry.log_performance, duration_ms, agent_timings))
+
+        # Publish to Redpanda stream
+        print("[REDPANDA] Publishing to event stream...")
+        tg.create_task(asyncio.to_thread(redpanda.publish_anomaly_event, verdict))
+
+        # Store in Senso knowledge base
+        print("[SENSO] Storing in knowledge base...")
+        tg.create_task(asyncio.to_thread(senso.store_anomaly, verdict))
+
+        # Generate voice alert for critical anomalies (severity >= 8)
+        if verdict.severity >= 8:
+            print("\n🔊 Generating voice alert for critical anomaly...")
+            from src.integrations.elevenlabs_voice import ElevenLabsVoice
+            voice = ElevenLabsVoice()
+            tg.create_task(asyncio.to_thread(
+                voice.generate_alert, verdict.summary, verdict.severity, verdict.confidence
+            ))
+
+
+def demo_command(sponsors: bool = True):
     """Generate demo dataset and run detection"""
 
     print("[DEMO] Generating sample anomaly dataset...")
 
     # Generate data
-    sys.path.insert(0, str(Path(__file__).parent / "demo"))
-    from sample_anomalies import generate_sample_data
+    from demo.sample_anomalies import generate_sample_data
 
-    data_path = "demo/sample_anomalies.csv"
-    generate_sample_data(data_path)
+    # Keep the dataset in memory instead of round-tripping through CSV
+    df = generate_sample_data(save_csv=False)
 
     print("\n[DEMO] Running anomaly detection...")
 
+    async def run():
+        try:
+            await _run_detect(
+                df["value"].to_numpy(dtype=np.float32),
+                df["timestamp"].tolist(),
+                "demo/sample_anomalies",
+                sponsors
+            )
+        finally:
+            await _close_clients()
+
     # Run detection
-    asyncio.run(detect_command(data_path))
+    asyncio.run(run())
 
 
 def help_command():
@@ -179,9 +409,12 @@ USAGE:
   python3 cli.py <command> [options]
 
 COMMANDS:
-  detect <file>   Detect anomalies in CSV file
-  demo            Generate demo dataset and run detection
-  help            Show this help message
+  detect <file>...  Detect anomalies in one or more CSV files
+  demo              Generate demo dataset and run detection
+  help              Show this help message
+
+OPTIONS:
+  --no-sponsors     Skip sponsor integrations and run the agents locally
 
 EXAMPLES:
   # Run demo
@@ -190,6 +423,12 @@ EXAMPLES:
   # Detect anomalies in your data
   python3 cli.py detect data/metrics.csv
 
+  # Detect anomalies in several files, sharing sponsor connections
+  python3 cli.py detect demo/data_*.csv
+
+  # Quick local run without any sponsor services
+  python3 cli.py detect --no-sponsors data/metrics.csv
+
 CSV FORMAT:
   Required columns:
     - value: numeric data points
@@ -210,9 +449,34 @@ SPONSORS:
 """)
 
 
+def build_parser() -> argparse.ArgumentParser:
+    """Build the CLI argument parser"""
+
+    parser = argparse.ArgumentParser(prog="cli.py", add_help=False)
+    subparsers = parser.add_subparsers(dest="command")
+
+    detect = subparsers.add_parser("detect", add_help=False)
+    detect.add_argument("data_paths", nargs="+", metavar="file")
+    detect.add_argument("--no-sponsors", dest="sponsors", action="store_false")
+    detect.set_defaults(func=lambda args: asyncio.run(run_detection(args.data_paths, args.sponsors)))
+
+    demo = subparsers.add_parser("demo", add_help=False)
+    demo.add_argument("--no-sponsors", dest="sponsors", action="store_false")
+    demo.set_defaults(func=lambda args: demo_command(args.sponsors))
+
+    for name in ("help", "--help", "-h"):
+        subparsers.add_parser(name, add_help=False).set_defaults(func=lambda args: help_command())
+
+    return parser
+
+
 def main():
     """Main CLI entry point"""
 
+    parser = build_parser()
+    if ARGCOMPLETE_AVAILABLE:
+        argcomplete.autocomplete(parser)
+
     print_banner()
 
     if len(sys.argv) < 2:
@@ -221,27 +485,19 @@ def main():
         sys.exit(1)
 
     command = sys.argv[1].lower()
-
-    if command == "detect":
-        if len(sys.argv) < 3:
-            print("[ERROR] Missing file path")
-            print("Usage: python3 cli.py detect <file>")
-            sys.exit(1)
-
-        data_path = sys.argv[2]
-        asyncio.run(detect_command(data_path))
-
-    elif command == "demo":
-        demo_command()
-
-    elif command == "help" or command == "--help" or command == "-h":
-        help_command()
-
-    else:
+    if command not in ("detect", "demo", "help", "--help", "-h"):
         print(f"[ERROR] Unknown command: {command}")
         help_command()
         sys.exit(1)
 
+    if command == "detect" and len(sys.argv) < 3:
+        print("[ERROR] Missing file path")
+        print("Usage: python3 cli.py detect <file>...")
+        sys.exit(1)
+
+    args = parser.parse_args([command] + sys.argv[2:])
+    args.func(args)
+
 
 if __name__ == "__main__":
     main()
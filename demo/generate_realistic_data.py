@@ -5,54 +5,163 @@ Generate realistic anomaly datasets for different scenarios
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import os
 
+# Arrow's multithreaded CSV writer (optional)
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pa_compute
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+    pa_compute = None
+    pa_csv = None
+
+CACHE_DIR = 'demo/.cache'
+
+# Timestamp column format, matching datetime.isoformat()
+ISO_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+# Any edit to this generator invalidates previously cached values
+with open(__file__, 'rb') as _f:
+    _SOURCE_DIGEST = hashlib.blake2b(_f.read(), digest_size=8).hexdigest()
+
+
+def _cache_path(name: str, seed: int, n_points: int) -> str:
+    """Content-addressed cache location for a scenario's values"""
+    key = hashlib.blake2b(
+        f"{name}:{seed}:{n_points}:{_SOURCE_DIGEST}".encode(), digest_size=8
+    ).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.npy")
+
+
+def _load_cached(name: str, seed: int, n_points: int):
+    """Return cached scenario values, or None if not generated yet"""
+    path = _cache_path(name, seed, n_points)
+    if os.path.exists(path):
+        return np.load(path)
+    return None
+
+
+def _save_cached(name: str, seed: int, n_points: int, data: np.ndarray):
+    """Store generated scenario values for reuse by later runs"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    np.save(_cache_path(name, seed, n_points), data)
+
+
+def _label_column(label: str, n_points: int) -> pd.Categorical:
+    """Constant string column stored as 1-byte codes plus a single category"""
+    return pd.Categorical.from_codes(np.zeros(n_points, dtype=np.int8), categories=[label])
+
+
+def _write_csv(df: pd.DataFrame, path: str):
+    """
+    Write a scenario dataset
+
+    The file is staged next to its destination and renamed into place, so
+    readers never see a partially written CSV. The value column is also
+    saved as a float32 .npy beside it, which `cli.py detect` memory-maps
+    instead of parsing the CSV.
+    """
+    _write_file(path, lambda tmp_path: _write_table(df, tmp_path))
+    _write_file(
+        os.path.splitext(path)[0] + '.npy',
+        lambda tmp_path: np.save(tmp_path, df['value'].to_numpy(dtype=np.float32))
+    )
+
+
+def _write_table(df: pd.DataFrame, path: str):
+    """Write df as CSV (ISO timestamps, unquoted), using Arrow's C++ writer when installed"""
+    if PYARROW_AVAILABLE:
+        # Categorical label columns convert to dictionary-encoded arrays
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        for i, field in enumerate(table.schema):
+            if pa.types.is_timestamp(field.type):
+                table = table.set_column(
+                    i, field.name, pa_compute.strftime(table.column(i), format=ISO_FORMAT)
+                )
+        # Header written by hand: older Arrow releases always quote it
+        with open(path, 'wb') as f:
+            f.write((','.join(table.column_names) + '\n').encode())
+            pa_csv.write_csv(table, f, pa_csv.WriteOptions(include_header=False, quoting_style="none"))
+    else:
+        df.to_csv(path, index=False, date_format=ISO_FORMAT)
+
+
+def _write_file(path: str, write):
+    """Call write() on a temp path next to path, then rename it into place"""
+    # Keep the real extension last (np.save appends .npy otherwise)
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.{os.getpid()}.tmp{ext}"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
 
 def scenario_1_database_spike():
     """
     Scenario 1: Database Connection Spike
     Real-world pattern: Deployment causes connection pool exhaustion
     """
-    np.random.seed(42)
+    seed = 42
 
     n_points = 200
     baseline = 150  # Average connections
     noise = 15
 
-    # Normal baseline with hourly pattern
-    hours = np.arange(n_points)
-    daily_pattern = 20 * np.sin(2 * np.pi * hours / 24)  # Daily cycle
-    data = baseline + daily_pattern + np.random.normal(0, noise, n_points)
-
     # Deployment event at hour 100 - sudden spike
     deployment_time = 100
     spike_duration = 15
-    for i in range(deployment_time, deployment_time + spike_duration):
-        if i < n_points:
-            # Exponential spike then decay
-            factor = np.exp(-(i - deployment_time) / 5)
-            data[i] += 300 * factor
+
+    data = _load_cached('database_spike', seed, n_points)
+    if data is None:
+        rng = np.random.default_rng(seed)
+
+        # Normal baseline with hourly pattern
+        hours = np.arange(n_points, dtype=np.float32)
+        daily_pattern = np.empty(n_points, dtype=np.float32)
+        np.sin(2 * np.pi * hours / 24, out=daily_pattern)
+        daily_pattern *= 20  # Daily cycle
+        data = rng.standard_normal(n_points, dtype=np.float32) * noise + baseline
+        data += daily_pattern
+
+        end = min(deployment_time + spike_duration, n_points)
+        i = np.arange(deployment_time, end)
+        # Exponential spike then decay
+        data[deployment_time:end] += 300 * np.exp(-(i - deployment_time) / 5)
+
+        _save_cached('database_spike', seed, n_points, data)
 
     # Create timestamps (hourly data)
     start_time = datetime(2024, 10, 17, 0, 0, 0)
-    timestamps = [(start_time + timedelta(hours=i)).isoformat() for i in range(n_points)]
+    timestamps = pd.date_range(start_time, periods=n_points, freq=timedelta(hours=1), unit='s')
 
     df = pd.DataFrame({
         'timestamp': timestamps,
         'value': data,
-        'metric': 'database_connections',
-        'source': 'prod_db_01'
+        'metric': _label_column('database_connections', n_points),
+        'source': _label_column('prod_db_01', n_points)
     })
 
     path = 'demo/data_database_spike.csv'
     os.makedirs('demo', exist_ok=True)
-    df.to_csv(path, index=False)
+    _write_csv(df, path)
 
-    print(f"✅ Scenario 1: Database Connection Spike")
-    print(f"   Location: {path}")
-    print(f"   Anomaly: Spike at hour {deployment_time} (deployment event)")
-    print(f"   Severity: HIGH (connection pool exhaustion)")
-    print()
+    print(
+        f"✅ Scenario 1: Database Connection Spike\n"
+        f"   Location: {path}\n"
+        f"   Anomaly: Spike at hour {deployment_time} (deployment event)\n"
+        f"   Severity: HIGH (connection pool exhaustion)\n\n",
+        end=""
+    )
 
     return df
 
@@ -62,46 +171,55 @@ def scenario_2_api_latency_drift():
     Scenario 2: Gradual API Latency Degradation
     Real-world pattern: Memory leak causing gradual performance decline
     """
-    np.random.seed(123)
+    seed = 123
 
     n_points = 300
     baseline = 50  # ms latency
     noise = 5
 
-    # Normal baseline
-    data = np.random.normal(baseline, noise, n_points)
-
     # Gradual drift starting at point 150 (memory leak)
     leak_start = 150
-    for i in range(leak_start, n_points):
-        # Linear increase (memory leak)
-        data[i] += (i - leak_start) * 0.3
 
-    # Add occasional spikes (GC pauses)
-    gc_pauses = [180, 210, 240, 270]
-    for pause_idx in gc_pauses:
-        if pause_idx < n_points:
-            data[pause_idx] += np.random.uniform(50, 100)
+    data = _load_cached('api_latency_drift', seed, n_points)
+    if data is None:
+        rng = np.random.default_rng(seed)
+
+        # Normal baseline
+        data = rng.standard_normal(n_points, dtype=np.float32) * noise + baseline
+
+        for i in range(leak_start, n_points):
+            # Linear increase (memory leak)
+            data[i] += (i - leak_start) * 0.3
+
+        # Add occasional spikes (GC pauses)
+        gc_pauses = [180, 210, 240, 270]
+        for pause_idx in gc_pauses:
+            if pause_idx < n_points:
+                data[pause_idx] += rng.uniform(50, 100)
+
+        _save_cached('api_latency_drift', seed, n_points, data)
 
     # Create timestamps (every 5 minutes)
     start_time = datetime(2024, 10, 17, 0, 0, 0)
-    timestamps = [(start_time + timedelta(minutes=i*5)).isoformat() for i in range(n_points)]
+    timestamps = pd.date_range(start_time, periods=n_points, freq=timedelta(minutes=5), unit='s')
 
     df = pd.DataFrame({
         'timestamp': timestamps,
         'value': data,
-        'metric': 'api_latency_p95',
-        'source': 'api_gateway'
+        'metric': _label_column('api_latency_p95', n_points),
+        'source': _label_column('api_gateway', n_points)
     })
 
     path = 'demo/data_api_latency_drift.csv'
-    df.to_csv(path, index=False)
+    _write_csv(df, path)
 
-    print(f"✅ Scenario 2: API Latency Degradation")
-    print(f"   Location: {path}")
-    print(f"   Anomaly: Gradual drift starting at point {leak_start} (memory leak)")
-    print(f"   Severity: MEDIUM (performance degradation)")
-    print()
+    print(
+        f"✅ Scenario 2: API Latency Degradation\n"
+        f"   Location: {path}\n"
+        f"   Anomaly: Gradual drift starting at point {leak_start} (memory leak)\n"
+        f"   Severity: MEDIUM (performance degradation)\n\n",
+        end=""
+    )
 
     return df
 
@@ -111,44 +229,53 @@ def scenario_3_cache_miss_pattern():
     Scenario 3: Cache Invalidation Event
     Real-world pattern: Cache clear causes sudden traffic spike to database
     """
-    np.random.seed(456)
+    seed = 456
 
     n_points = 250
     baseline = 5  # Cache miss rate (%)
     noise = 1
 
-    # Normal baseline
-    data = np.random.normal(baseline, noise, n_points)
-
     # Cache invalidation events
     cache_clears = [80, 170]
-    for clear_idx in cache_clears:
-        # Sudden spike then gradual recovery
-        recovery_period = 30
-        for i in range(clear_idx, min(clear_idx + recovery_period, n_points)):
+
+    data = _load_cached('cache_miss', seed, n_points)
+    if data is None:
+        rng = np.random.default_rng(seed)
+
+        # Normal baseline
+        data = rng.standard_normal(n_points, dtype=np.float32) * noise + baseline
+
+        for clear_idx in cache_clears:
+            # Sudden spike then gradual recovery
+            recovery_period = 30
+            end = min(clear_idx + recovery_period, n_points)
+            i = np.arange(clear_idx, end)
             # Exponential decay back to baseline
-            factor = np.exp(-(i - clear_idx) / 10)
-            data[i] += 40 * factor
+            data[clear_idx:end] += 40 * np.exp(-(i - clear_idx) / 10)
+
+        _save_cached('cache_miss', seed, n_points, data)
 
     # Create timestamps (every 10 minutes)
     start_time = datetime(2024, 10, 17, 0, 0, 0)
-    timestamps = [(start_time + timedelta(minutes=i*10)).isoformat() for i in range(n_points)]
+    timestamps = pd.date_range(start_time, periods=n_points, freq=timedelta(minutes=10), unit='s')
 
     df = pd.DataFrame({
         'timestamp': timestamps,
         'value': data,
-        'metric': 'cache_miss_rate',
-        'source': 'redis_cluster'
+        'metric': _label_column('cache_miss_rate', n_points),
+        'source': _label_column('redis_cluster', n_points)
     })
 
     path = 'demo/data_cache_miss.csv'
-    df.to_csv(path, index=False)
+    _write_csv(df, path)
 
-    print(f"✅ Scenario 3: Cache Invalidation Pattern")
-    print(f"   Location: {path}")
-    print(f"   Anomaly: Spikes at indices {cache_clears} (cache clears)")
-    print(f"   Severity: MEDIUM (temporary performance impact)")
-    print()
+    print(
+        f"✅ Scenario 3: Cache Invalidation Pattern\n"
+        f"   Location: {path}\n"
+        f"   Anomaly: Spikes at indices {cache_clears} (cache clears)\n"
+        f"   Severity: MEDIUM (temporary performance impact)\n\n",
+        end=""
+    )
 
     return df
 
@@ -158,42 +285,54 @@ def scenario_4_disk_io_saturation():
     Scenario 4: Disk I/O Saturation
     Real-world pattern: Batch job causes disk contention
     """
-    np.random.seed(789)
+    seed = 789
 
     n_points = 180
     baseline = 30  # % disk utilization
     noise = 5
 
-    # Normal baseline with daily pattern
-    hours = np.arange(n_points)
-    business_hours = 10 * np.sin(2 * np.pi * hours / 24 - np.pi/2)  # Peak during day
-    data = baseline + business_hours + np.random.normal(0, noise, n_points)
-
     # Batch job at night (hour 120-140) causes saturation
     batch_start = 120
     batch_duration = 20
-    for i in range(batch_start, min(batch_start + batch_duration, n_points)):
-        data[i] = np.random.uniform(85, 98)  # Near saturation
+
+    data = _load_cached('disk_saturation', seed, n_points)
+    if data is None:
+        rng = np.random.default_rng(seed)
+
+        # Normal baseline with daily pattern
+        hours = np.arange(n_points, dtype=np.float32)
+        business_hours = np.empty(n_points, dtype=np.float32)
+        np.sin(2 * np.pi * hours / 24 - np.pi/2, out=business_hours)
+        business_hours *= 10  # Peak during day
+        data = rng.standard_normal(n_points, dtype=np.float32) * noise + baseline
+        data += business_hours
+
+        end = min(batch_start + batch_duration, n_points)
+        data[batch_start:end] = rng.uniform(85, 98, size=end - batch_start)  # Near saturation
+
+        _save_cached('disk_saturation', seed, n_points, data)
 
     # Create timestamps (hourly)
     start_time = datetime(2024, 10, 17, 0, 0, 0)
-    timestamps = [(start_time + timedelta(hours=i)).isoformat() for i in range(n_points)]
+    timestamps = pd.date_range(start_time, periods=n_points, freq=timedelta(hours=1), unit='s')
 
     df = pd.DataFrame({
         'timestamp': timestamps,
         'value': data,
-        'metric': 'disk_io_util',
-        'source': 'app_server_03'
+        'metric': _label_column('disk_io_util', n_points),
+        'source': _label_column('app_server_03', n_points)
     })
 
     path = 'demo/data_disk_saturation.csv'
-    df.to_csv(path, index=False)
+    _write_csv(df, path)
 
-    print(f"✅ Scenario 4: Disk I/O Saturation")
-    print(f"   Location: {path}")
-    print(f"   Anomaly: Saturation at hours {batch_start}-{batch_start+batch_duration} (batch job)")
-    print(f"   Severity: HIGH (impacts all operations)")
-    print()
+    print(
+        f"✅ Scenario 4: Disk I/O Saturation\n"
+        f"   Location: {path}\n"
+        f"   Anomaly: Saturation at hours {batch_start}-{batch_start+batch_duration} (batch job)\n"
+        f"   Severity: HIGH (impacts all operations)\n\n",
+        end=""
+    )
 
     return df
 
@@ -203,16 +342,12 @@ def scenario_5_network_packet_loss():
     Scenario 5: Network Packet Loss Bursts
     Real-world pattern: Network equipment failure causing intermittent drops
     """
-    np.random.seed(321)
+    seed = 321
 
     n_points = 400
     baseline = 0.1  # % packet loss (normal)
     noise = 0.05
 
-    # Normal baseline (very low loss)
-    data = np.random.normal(baseline, noise, n_points)
-    data = np.clip(data, 0, None)  # Can't be negative
-
     # Network issues - burst of packet loss
     issue_periods = [
         (100, 115),  # First incident
@@ -220,30 +355,42 @@ def scenario_5_network_packet_loss():
         (320, 350),  # Extended outage
     ]
 
-    for start, end in issue_periods:
-        for i in range(start, min(end, n_points)):
+    data = _load_cached('network_loss', seed, n_points)
+    if data is None:
+        rng = np.random.default_rng(seed)
+
+        # Normal baseline (very low loss)
+        data = rng.standard_normal(n_points, dtype=np.float32) * noise + baseline
+        np.clip(data, 0, None, out=data)  # Can't be negative
+
+        for start, end in issue_periods:
+            end = min(end, n_points)
             # Random high packet loss
-            data[i] = np.random.uniform(2, 8)
+            data[start:end] = rng.uniform(2, 8, size=end - start)
+
+        _save_cached('network_loss', seed, n_points, data)
 
     # Create timestamps (every minute)
     start_time = datetime(2024, 10, 17, 0, 0, 0)
-    timestamps = [(start_time + timedelta(minutes=i)).isoformat() for i in range(n_points)]
+    timestamps = pd.date_range(start_time, periods=n_points, freq=timedelta(minutes=1), unit='s')
 
     df = pd.DataFrame({
         'timestamp': timestamps,
         'value': data,
-        'metric': 'packet_loss_pct',
-        'source': 'network_switch_02'
+        'metric': _label_column('packet_loss_pct', n_points),
+        'source': _label_column('network_switch_02', n_points)
     })
 
     path = 'demo/data_network_loss.csv'
-    df.to_csv(path, index=False)
+    _write_csv(df, path)
 
-    print(f"✅ Scenario 5: Network Packet Loss")
-    print(f"   Location: {path}")
-    print(f"   Anomaly: Bursts at {len(issue_periods)} time periods (network failure)")
-    print(f"   Severity: CRITICAL (data loss)")
-    print()
+    print(
+        f"✅ Scenario 5: Network Packet Loss\n"
+        f"   Location: {path}\n"
+        f"   Anomaly: Bursts at {len(issue_periods)} time periods (network failure)\n"
+        f"   Severity: CRITICAL (data loss)\n\n",
+        end=""
+    )
 
     return df
 
@@ -253,43 +400,52 @@ def scenario_6_error_rate_spike():
     Scenario 6: Error Rate Spike
     Real-world pattern: API rate limiting causing 429 errors
     """
-    np.random.seed(654)
+    seed = 654
 
     n_points = 300
     baseline = 0.5  # % error rate (normal)
     noise = 0.2
 
-    # Normal baseline
-    data = np.random.normal(baseline, noise, n_points)
-    data = np.clip(data, 0, None)
-
     # Rate limiting kicks in
     rate_limit_start = 150
     rate_limit_duration = 40
-    for i in range(rate_limit_start, min(rate_limit_start + rate_limit_duration, n_points)):
+
+    data = _load_cached('error_spike', seed, n_points)
+    if data is None:
+        rng = np.random.default_rng(seed)
+
+        # Normal baseline
+        data = rng.standard_normal(n_points, dtype=np.float32) * noise + baseline
+        np.clip(data, 0, None, out=data)
+
+        end = min(rate_limit_start + rate_limit_duration, n_points)
+        i = np.arange(rate_limit_start, end)
         # Exponential spike then decay as clients back off
-        factor = np.exp(-(i - rate_limit_start) / 15)
-        data[i] += 20 * factor
+        data[rate_limit_start:end] += 20 * np.exp(-(i - rate_limit_start) / 15)
+
+        _save_cached('error_spike', seed, n_points, data)
 
     # Create timestamps (every 2 minutes)
     start_time = datetime(2024, 10, 17, 0, 0, 0)
-    timestamps = [(start_time + timedelta(minutes=i*2)).isoformat() for i in range(n_points)]
+    timestamps = pd.date_range(start_time, periods=n_points, freq=timedelta(minutes=2), unit='s')
 
     df = pd.DataFrame({
         'timestamp': timestamps,
         'value': data,
-        'metric': 'error_rate_pct',
-        'source': 'api_gateway'
+        'metric': _label_column('error_rate_pct', n_points),
+        'source': _label_column('api_gateway', n_points)
     })
 
     path = 'demo/data_error_spike.csv'
-    df.to_csv(path, index=False)
+    _write_csv(df, path)
 
-    print(f"✅ Scenario 6: Error Rate Spike")
-    print(f"   Location: {path}")
-    print(f"   Anomaly: Spike at point {rate_limit_start} (rate limiting)")
-    print(f"   Severity: HIGH (service degradation)")
-    print()
+    print(
+        f"✅ Scenario 6: Error Rate Spike\n"
+        f"   Location: {path}\n"
+        f"   Anomaly: Spike at point {rate_limit_start} (rate limiting)\n"
+        f"   Severity: HIGH (service degradation)\n\n",
+        end=""
+    )
 
     return df
 
@@ -299,45 +455,53 @@ def scenario_7_memory_leak():
     Scenario 7: Memory Leak (Gradual Increase)
     Real-world pattern: Slow memory leak eventually causing OOM
     """
-    np.random.seed(987)
+    seed = 987
 
     n_points = 500
     baseline = 2.5  # GB memory usage
     noise = 0.1
 
-    # Start normal
-    data = np.random.normal(baseline, noise, 200)
-
     # Leak starts at point 200
     leak_start = 200
-    for i in range(leak_start, n_points):
+
+    data = _load_cached('memory_leak', seed, n_points)
+    if data is None:
+        rng = np.random.default_rng(seed)
+
+        # Start normal
+        data = rng.standard_normal(n_points, dtype=np.float32) * noise + baseline
+
+        idx = np.arange(leak_start, n_points)
         # Quadratic growth (leak accelerates)
-        leak_factor = ((i - leak_start) / 100) ** 1.5
-        data = np.append(data, baseline + leak_factor + np.random.normal(0, noise))
+        data[leak_start:] += ((idx - leak_start) / 100) ** 1.5
 
-    # OOM restart at point 480
-    if len(data) > 480:
-        data[480:] = np.random.normal(baseline, noise, len(data) - 480)
+        # OOM restart at point 480
+        if n_points > 480:
+            data[480:] = rng.standard_normal(n_points - 480, dtype=np.float32) * noise + baseline
+
+        _save_cached('memory_leak', seed, n_points, data)
 
     # Create timestamps (every 5 minutes)
     start_time = datetime(2024, 10, 17, 0, 0, 0)
-    timestamps = [(start_time + timedelta(minutes=i*5)).isoformat() for i in range(n_points)]
+    timestamps = pd.date_range(start_time, periods=n_points, freq=timedelta(minutes=5), unit='s')
 
     df = pd.DataFrame({
         'timestamp': timestamps,
         'value': data,
-        'metric': 'memory_usage_gb',
-        'source': 'app_server_01'
+        'metric': _label_column('memory_usage_gb', n_points),
+        'source': _label_column('app_server_01', n_points)
     })
 
     path = 'demo/data_memory_leak.csv'
-    df.to_csv(path, index=False)
+    _write_csv(df, path)
 
-    print(f"✅ Scenario 7: Memory Leak")
-    print(f"   Location: {path}")
-    print(f"   Anomaly: Gradual increase from point {leak_start}, restart at 480 (OOM)")
-    print(f"   Severity: CRITICAL (service crash)")
-    print()
+    print(
+        f"✅ Scenario 7: Memory Leak\n"
+        f"   Location: {path}\n"
+        f"   Anomaly: Gradual increase from point {leak_start}, restart at 480 (OOM)\n"
+        f"   Severity: CRITICAL (service crash)\n\n",
+        end=""
+    )
 
     return df
 
@@ -359,10 +523,12 @@ def generate_all_scenarios():
         scenario_7_memory_leak,
     ]
 
-    dfs = []
-    for scenario_func in scenarios:
-        df = scenario_func()
-        dfs.append(df)
+    # Scenarios are independent (own RNG, own output file), so run them in
+    # parallel threads; each reports with a single print so output blocks
+    # don't interleave, and map() keeps results in scenario order
+    os.makedirs('demo', exist_ok=True)
+    with ThreadPoolExecutor(max_workers=len(scenarios)) as executor:
+        dfs = list(executor.map(lambda scenario_func: scenario_func(), scenarios))
 
     print("="*70)
     print(f"✅ Generated {len(scenarios)} realistic datasets")
@@ -7,10 +7,14 @@ import pandas as pd
 from datetime import datetime, timedelta
 import os
 
-def generate_sample_data(output_path: str = "demo/sample_anomalies.csv"):
+def generate_sample_data(output_path: str = "demo/sample_anomalies.csv", save_csv: bool = True):
     """
     Generate sample time-series data with obvious anomalies
 
+    Args:
+        output_path: CSV destination
+        save_csv: Write the dataset to output_path (False keeps it in memory only)
+
     Anomalies injected:
     1. Spike at index 20 (2.5x baseline)
     2. Dip at indices 45-50 (30% of baseline)
@@ -18,7 +22,7 @@ def generate_sample_data(output_path: str = "demo/sample_anomalies.csv"):
     4. Gradual drift in second half (20% increase)
     """
 
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
 
     # Generate 100 data points
     n_points = 100
@@ -26,7 +30,7 @@ def generate_sample_data(output_path: str = "demo/sample_anomalies.csv"):
     noise = 10
 
     # Normal data with noise
-    data = np.random.normal(baseline, noise, n_points)
+    data = rng.normal(baseline, noise, n_points)
 
     # Inject anomalies
     data[20] = 250  # Spike (2.5x)
@@ -51,14 +55,16 @@ def generate_sample_data(output_path: str = "demo/sample_anomalies.csv"):
         "source": "demo_sensor"
     })
 
-    # Ensure demo directory exists
-    os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else ".", exist_ok=True)
+    print(f"[OK] Generated {n_points} data points with {4} anomalies")
+
+    if save_csv:
+        # Ensure demo directory exists
+        os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else ".", exist_ok=True)
 
-    # Save to CSV
-    df.to_csv(output_path, index=False)
+        # Save to CSV
+        df.to_csv(output_path, index=False)
+        print(f"[OK] Saved to: {output_path}")
 
-    print(f"[OK] Generated {n_points} data points with {4} anomalies")
-    print(f"[OK] Saved to: {output_path}")
     print(f"\nAnomalies:")
     print(f"  - Index 20: Spike to {data[20]:.1f}")
     print(f"  - Indices 45-50: Dip to ~{np.mean(data[45:50]):.1f}")
@@ -0,0 +1,89 @@
+"""
+Helpers shared by the evaluation suites
+"""
+
+import asyncio
+import dataclasses
+import functools
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _shape_baseline(normal: np.ndarray, mean: float, std: float, lo: float, hi: float):
+    """Scale standard normals in place to N(mean, std), clipped to [lo, hi]"""
+    for i in range(normal.shape[0]):
+        value = normal[i] * std + mean
+        if value < lo:
+            value = lo
+        elif value > hi:
+            value = hi
+        normal[i] = value
+
+
+if NUMBA_AVAILABLE:
+    # One fused pass instead of three ufunc passes. Not cached on disk: the
+    # cache is keyed by module name and breaks when imported another way
+    _shape_baseline = njit(_shape_baseline)
+
+
+def build_series(rng: np.random.Generator, mean: float, std: float, n_normal: int,
+                 tail: list, clip: tuple = None) -> np.ndarray:
+    """
+    n_normal Gaussian samples (optionally clipped) followed by the tail
+    segments, written into one preallocated buffer
+    """
+    data = np.empty(n_normal + sum(len(segment) for segment in tail))
+    normal = data[:n_normal]
+    rng.standard_normal(out=normal)
+    if NUMBA_AVAILABLE:
+        lo, hi = clip if clip is not None else (-np.inf, np.inf)
+        _shape_baseline(normal, float(mean), float(std), float(lo), float(hi))
+    else:
+        normal *= std
+        normal += mean
+        if clip is not None:
+            np.clip(normal, *clip, out=normal)
+
+    start = n_normal
+    for segment in tail:
+        data[start:start + len(segment)] = segment
+        start += len(segment)
+    return data
+
+
+def cached_context(generate):
+    """
+    Memoize an evaluator's seeded AnomalyContext generator
+
+    Results are kept in the evaluator's _context_cache, keyed by generator
+    name. Callers get fresh copies of the data array and metadata dict.
+    """
+    @functools.wraps(generate)
+    def wrapper(self):
+        cached = self._context_cache.get(generate.__name__)
+        if cached is None:
+            cached = self._context_cache[generate.__name__] = generate(self)
+        return dataclasses.replace(cached, data=cached.data.copy(), metadata=dict(cached.metadata))
+    return wrapper
+
+
+async def run_bounded(jobs, limit: int, evaluate):
+    """
+    Await evaluate(*job) for every job, at most limit at a time
+
+    Jobs are independent investigations, so their LLM/RAG waits overlap;
+    the limit caps concurrent requests. Results are returned in job order,
+    regardless of completion order.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def evaluate_limited(job):
+        async with semaphore:
+            return await evaluate(*job)
+
+    return await asyncio.gather(*(evaluate_limited(job) for job in jobs))
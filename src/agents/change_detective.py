@@ -3,15 +3,70 @@ Change Detective Agent
 Role: Time-series drift analysis using Claude
 """
 
+import re
 import numpy as np
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import sentry_sdk
 
 # Import Weave decorator from orchestrator
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent))
-from orchestrator import weave_op_if_available
+from ..orchestrator import weave_op_if_available
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+_SEVERITY_RE = re.compile(r'severity[:\s]+(\d+)', re.IGNORECASE)
+_PATTERN_RE = re.compile(r'Pattern:([^\n]*)')
+
+
+def _change_points(data: np.ndarray, window: int) -> np.ndarray:
+    """
+    Indices where the moving-average slope exceeds 2 std of all slopes
+    (0.5 if the slope is constant), from one sliding-window pass
+    """
+    n = data.shape[0] - window  # Number of moving-average differences
+    if n <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    changes = np.empty(n)
+    total = 0.0
+    for i in range(window):
+        total += data[i]
+    previous = total / window
+    changes_sum = 0.0
+    for i in range(n):
+        total += data[i + window] - data[i]
+        current = total / window
+        changes[i] = current - previous
+        changes_sum += changes[i]
+        previous = current
+
+    changes_mean = changes_sum / n
+    squares = 0.0
+    for i in range(n):
+        squares += (changes[i] - changes_mean) ** 2
+    changes_std = np.sqrt(squares / n)
+    if changes_std == 0:
+        # Constant slope: either every point crosses the 0.5 threshold or none does
+        if abs(changes[0]) > 0.5:
+            return np.arange(1, n + 1)
+        return np.empty(0, dtype=np.int64)
+    change_threshold = 2 * changes_std
+
+    points = np.empty(n, dtype=np.int64)
+    count = 0
+    for i in range(n):
+        if abs(changes[i]) > change_threshold:
+            points[count] = i + 1  # +1 to account for diff offset
+            count += 1
+    return points[:count]
+
+
+if NUMBA_AVAILABLE:
+    # Compiled lazily by the first detection in the process
+    _change_points = njit(_change_points)
 
 
 class ChangeDetective:
@@ -87,8 +142,8 @@ class ChangeDetective:
 
                 llm_span.set_data("response_length", len(llm_analysis))
 
-            # Extract severity and confidence
-            severity = self._extract_severity(llm_analysis)
+            # Extract severity, pattern and confidence
+            severity, pattern = self._parse_llm_response(llm_analysis)
             confidence = self._calculate_confidence(change_result)
 
             agent_span.set_data("severity", severity)
@@ -96,7 +151,7 @@ class ChangeDetective:
 
             return {
                 "agent_name": self.name,
-                "finding": self._format_finding(change_result, llm_analysis),
+                "finding": self._format_finding(change_result, pattern),
                 "confidence": confidence,
                 "severity": severity,
                 "evidence": {
@@ -114,24 +169,32 @@ class ChangeDetective:
         if window < 2:
             window = 2
 
-        # Calculate moving average
-        moving_avg = self._moving_average(data, window)
+        if NUMBA_AVAILABLE:
+            # Moving average, derivative and threshold fused into one compiled kernel
+            change_points = _change_points(data, window).tolist()
+        else:
+            # Calculate moving average
+            moving_avg = self._moving_average(data, window)
 
-        # Detect abrupt changes (derivative analysis)
-        changes = np.diff(moving_avg)
-        change_threshold = 2 * np.std(changes) if np.std(changes) > 0 else 0.5
+            # Detect abrupt changes (derivative analysis)
+            changes = np.diff(moving_avg)
+            changes_std = float(np.std(changes))
 
-        change_points = []
-        for i in range(len(changes)):
-            if abs(changes[i]) > change_threshold:
-                change_points.append(i + 1)  # +1 to account for diff offset
+            if changes_std == 0.0:
+                # Constant slope: either every point crosses the 0.5 threshold or none does
+                change_points = list(range(1, len(changes) + 1)) if abs(changes[0]) > 0.5 else []
+            else:
+                change_threshold = 2.0 * changes_std
+
+                # +1 to account for diff offset
+                change_points = (np.flatnonzero(np.abs(changes) > change_threshold) + 1).tolist()
 
         # Drift detection (trend analysis)
         first_half = data[:len(data)//2]
         second_half = data[len(data)//2:]
 
-        mean_first = float(np.mean(first_half))
-        mean_second = float(np.mean(second_half))
+        mean_first = np.mean(first_half)
+        mean_second = np.mean(second_half)
         drift_percentage = ((mean_second - mean_first) / mean_first * 100) if mean_first != 0 else 0
 
         drift_detected = abs(drift_percentage) > 20  # 20% threshold
@@ -147,16 +210,22 @@ class ChangeDetective:
         return {
             "change_points": change_points[:10],  # Top 10
             "change_count": len(change_points),
-            "drift_detected": drift_detected,
-            "drift_percentage": drift_percentage,
+            # Python scalars only at the dict boundary
+            "drift_detected": bool(drift_detected),
+            "drift_percentage": float(drift_percentage),
             "trend": trend,
-            "mean_first_half": mean_first,
-            "mean_second_half": mean_second
+            "mean_first_half": float(mean_first),
+            "mean_second_half": float(mean_second)
         }
 
     def _moving_average(self, data: np.ndarray, window: int) -> np.ndarray:
-        """Calculate simple moving average"""
-        return np.convolve(data, np.ones(window)/window, mode='valid')
+        """Calculate simple moving average (same length as mode='valid' convolution)"""
+
+        # Window sums as differences of a running total: O(n) regardless of window
+        totals = np.empty(len(data) + 1)
+        totals[0] = 0.0
+        np.cumsum(data, dtype=np.float64, out=totals[1:])
+        return (totals[window:] - totals[:-window]) / window
 
     def _build_prompt(self, change_result: Dict[str, Any], context: Dict[str, Any]) -> str:
         """Build prompt for Claude analysis"""
@@ -222,14 +291,16 @@ Cause: [hypothesis]
             print(f"[WARN] StackAI call failed: {e}")
             return "Severity: 5\nPattern: Analysis unavailable\nCause: Unable to determine"
 
-    def _extract_severity(self, llm_response: str) -> int:
-        """Extract severity score from LLM response"""
+    def _parse_llm_response(self, llm_response: str) -> Tuple[int, str]:
+        """Extract severity score and pattern line from LLM response in one pass"""
+
+        match = _SEVERITY_RE.search(llm_response)
+        severity = min(10, max(1, int(match.group(1)))) if match else 5  # Default
 
-        import re
-        match = re.search(r'severity[:\s]+(\d+)', llm_response.lower())
-        if match:
-            return min(10, max(1, int(match.group(1))))
-        return 5  # Default
+        match = _PATTERN_RE.search(llm_response)
+        pattern = match.group(1).strip() if match else "Time-series changes detected"
+
+        return severity, pattern
 
     def _calculate_confidence(self, change_result: Dict[str, Any]) -> float:
         """Calculate confidence based on change evidence"""
@@ -254,16 +325,9 @@ Cause: [hypothesis]
 
         return min(1.0, confidence)
 
-    def _format_finding(self, change_result: Dict[str, Any], llm_analysis: str) -> str:
+    def _format_finding(self, change_result: Dict[str, Any], pattern: str) -> str:
         """Format final finding"""
 
-        # Extract pattern line from LLM
-        pattern_match = llm_analysis.split("Pattern:")
-        if len(pattern_match) > 1:
-            pattern = pattern_match[1].split("\n")[0].strip()
-        else:
-            pattern = "Time-series changes detected"
-
         drift_status = "with drift" if change_result["drift_detected"] else "stable baseline"
 
         finding = (
@@ -3,16 +3,79 @@ Pattern Analyst Agent
 Role: Statistical anomaly detection using GPT-4
 """
 
+import re
 import numpy as np
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from scipy import stats
 import sentry_sdk
 
 # Import Weave decorator from orchestrator
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent))
-from orchestrator import weave_op_if_available
+from ..orchestrator import weave_op_if_available
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+class _NoOpSpan:
+    """Stand-in for a Sentry span when tracing is off"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set_data(self, key, value):
+        pass
+
+
+_NO_OP_SPAN = _NoOpSpan()
+
+
+def _start_span(**kwargs):
+    """sentry_sdk.start_span when spans would be sent, otherwise a shared no-op span"""
+    client = sentry_sdk.get_client()
+    options = client.options if client.is_active() else {}
+    sampling = options.get("traces_sampler") or (options.get("traces_sample_rate") or 0) > 0
+    if client.transport is not None and sampling:
+        return sentry_sdk.start_span(**kwargs)
+    return _NO_OP_SPAN
+
+
+_SEVERITY_RE = re.compile(r'severity[:\s]+(\d+)', re.IGNORECASE)
+_PATTERN_RE = re.compile(r'Pattern:([^\n]*)')
+
+
+def _moments(data: np.ndarray) -> tuple:
+    """Mean, population std, min and max of data in a single pass (Welford)"""
+
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    lo = np.inf
+    hi = -np.inf
+    for x in data:
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+        if x < lo:
+            lo = x
+        if x > hi:
+            hi = x
+    return mean, np.sqrt(m2 / n), lo, hi
+
+
+if NUMBA_AVAILABLE:
+    # Compiled on first call, once per process
+    _moments = njit(_moments)
+else:
+    def _moments(data: np.ndarray) -> tuple:
+        """Mean, population std, min and max of data (numpy fallback)"""
+        return np.mean(data), np.std(data), np.min(data), np.max(data)
 
 
 class PatternAnalyst:
@@ -50,7 +113,7 @@ class PatternAnalyst:
         Returns:
             Finding dict with agent_name, finding, confidence, severity, evidence
         """
-        with sentry_sdk.start_span(
+        with _start_span(
             op="ai.agent.analyze",
             description="Pattern Analyst - Statistical Analysis"
         ) as agent_span:
@@ -64,11 +127,12 @@ class PatternAnalyst:
             agent_span.set_data("data_points", len(data))
 
             # Statistical analysis
-            with sentry_sdk.start_span(
+            with _start_span(
                 op="statistics",
                 description="Z-score and baseline analysis"
             ) as stats_span:
-                stats_result = self._statistical_analysis(data)
+                metadata = context.get("metadata") or {}
+                stats_result = self._statistical_analysis(data, metadata.get("stats"))
                 stats_span.set_data("anomalies_found", stats_result["anomaly_count"])
                 stats_span.set_data("mean", stats_result["mean"])
                 stats_span.set_data("std", stats_result["std"])
@@ -77,7 +141,7 @@ class PatternAnalyst:
             prompt = self._build_prompt(stats_result, context)
 
             # Get LLM analysis (if StackAI available)
-            with sentry_sdk.start_span(
+            with _start_span(
                 op="ai.llm.call",
                 description=f"LLM analysis via {self.model}"
             ) as llm_span:
@@ -88,8 +152,8 @@ class PatternAnalyst:
 
                 llm_span.set_data("response_length", len(llm_analysis))
 
-            # Extract severity and confidence
-            severity = self._extract_severity(llm_analysis)
+            # Extract severity, pattern and confidence
+            severity, pattern = self._parse_llm_response(llm_analysis)
             confidence = self._calculate_confidence(stats_result)
 
             agent_span.set_data("severity", severity)
@@ -97,7 +161,7 @@ class PatternAnalyst:
 
             return {
                 "agent_name": self.name,
-                "finding": self._format_finding(stats_result, llm_analysis),
+                "finding": self._format_finding(stats_result, pattern),
                 "confidence": confidence,
                 "severity": severity,
                 "evidence": {
@@ -107,28 +171,40 @@ class PatternAnalyst:
                 }
             }
 
-    def _statistical_analysis(self, data: np.ndarray) -> Dict[str, Any]:
-        """Perform statistical anomaly detection"""
+    def _statistical_analysis(self, data: np.ndarray, stats: Optional[tuple] = None) -> Dict[str, Any]:
+        """Perform statistical anomaly detection (stats: precomputed (mean, std))"""
 
-        mean = float(np.mean(data))
-        std = float(np.std(data))
-        median = float(np.median(data))
+        if stats is not None:
+            # Mean/std come from detection: only the extremes need a pass
+            mean, std = stats
+            data_min, data_max = np.min(data), np.max(data)
+        else:
+            mean, std, data_min, data_max = _moments(data)
+        median = np.median(data)
 
         # Z-score analysis (threshold: 3 standard deviations)
-        z_scores = np.abs((data - mean) / std) if std > 0 else np.zeros_like(data)
+        if std > 0:
+            z_scores = np.abs(data - mean)
+            z_scores /= std
+        else:
+            z_scores = np.zeros_like(data)
         anomaly_mask = z_scores > 3
         anomaly_indices = np.where(anomaly_mask)[0].tolist()
 
         # Max z-scores for top anomalies
-        max_z_indices = np.argsort(z_scores)[-5:][::-1]  # Top 5
-        max_z_scores = [(int(idx), float(z_scores[idx])) for idx in max_z_indices]
+        # Top 5: O(n) partition, then order only the selected few (descending)
+        k = min(5, len(z_scores))
+        max_z_indices = np.argpartition(z_scores, -k)[-k:] if k else np.empty(0, dtype=np.intp)
+        max_z_indices = max_z_indices[np.argsort(z_scores[max_z_indices])[::-1]]
+        max_z_scores = list(zip(max_z_indices.tolist(), z_scores[max_z_indices].tolist()))
 
         return {
-            "mean": mean,
-            "std": std,
-            "median": median,
-            "min": float(np.min(data)),
-            "max": float(np.max(data)),
+            # Python floats only at the dict boundary
+            "mean": float(mean),
+            "std": float(std),
+            "median": float(median),
+            "min": float(data_min),
+            "max": float(data_max),
             "anomaly_count": len(anomaly_indices),
             "anomaly_indices": anomaly_indices,
             "max_z_scores": max_z_scores,
@@ -198,14 +274,16 @@ Impact: [description]
             print(f"[WARN] StackAI call failed: {e}")
             return "Severity: 5\nPattern: Analysis unavailable\nImpact: Unable to determine"
 
-    def _extract_severity(self, llm_response: str) -> int:
-        """Extract severity score from LLM response"""
+    def _parse_llm_response(self, llm_response: str) -> Tuple[int, str]:
+        """Extract severity score and pattern line from LLM response in one pass"""
+
+        match = _SEVERITY_RE.search(llm_response)
+        severity = min(10, max(1, int(match.group(1)))) if match else 5  # Default
+
+        match = _PATTERN_RE.search(llm_response)
+        pattern = match.group(1).strip() if match else "Statistical anomalies detected"
 
-        import re
-        match = re.search(r'severity[:\s]+(\d+)', llm_response.lower())
-        if match:
-            return min(10, max(1, int(match.group(1))))
-        return 5  # Default
+        return severity, pattern
 
     def _calculate_confidence(self, stats: Dict[str, Any]) -> float:
         """Calculate confidence based on statistical evidence"""
@@ -232,16 +310,9 @@ Impact: [description]
 
         return min(1.0, confidence)
 
-    def _format_finding(self, stats: Dict[str, Any], llm_analysis: str) -> str:
+    def _format_finding(self, stats: Dict[str, Any], pattern: str) -> str:
         """Format final finding"""
 
-        # Extract pattern line from LLM
-        pattern_match = llm_analysis.split("Pattern:")
-        if len(pattern_match) > 1:
-            pattern = pattern_match[1].split("\n")[0].strip()
-        else:
-            pattern = "Statistical anomalies detected"
-
         finding = (
             f"{stats['anomaly_count']} anomalies detected. "
             f"{pattern}. "
@@ -3,15 +3,175 @@ Root Cause Agent
 Role: Hypothesis generation and root cause analysis using o1-mini
 """
 
+import asyncio
+import functools
+import hashlib
+import re
 import numpy as np
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterable, Tuple
 import sentry_sdk
 
 # Import Weave decorator from orchestrator
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent))
-from orchestrator import weave_op_if_available
+from ..orchestrator import weave_op_if_available
+from ..integrations.stackai_gateway import StackAITransientError
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+# Investigations analyzed at once by analyze_batch (bounds concurrent LLM requests)
+MAX_CONCURRENT_ANALYSES = 8
+
+# StackAI call limits: per-attempt timeout, attempts, first backoff (doubles each retry)
+LLM_TIMEOUT_SECONDS = 60
+LLM_RETRY_ATTEMPTS = 3
+LLM_RETRY_BACKOFF_SECONDS = 0.5
+
+# Transient failures worth another attempt (timeouts, 429/5xx, connection
+# errors); 4xx and anything else fails fast through the gateway's fallback
+_RETRYABLE_ERRORS = (asyncio.TimeoutError, StackAITransientError)
+
+# Default element type for the numeric analysis: float32 halves memory traffic, ample for IQR/correlation
+ANALYSIS_DTYPE = np.float32
+
+# float32 keeps ~7 significant digits, so wider series whose magnitude exceeds
+# their spread by more than this factor (epoch times, byte counters) stay float64
+FLOAT32_MAX_MAGNITUDE_RATIO = 1024
+
+# LLM answers remembered per agent, keyed by prompt digest (oldest evicted first)
+LLM_CACHE_SIZE = 128
+
+# "Key: value" fields expected in LLM responses. Keys are matched anywhere
+# (after list markers, inside prose, in **bold**), case-insensitively;
+# severity/confidence need a number after the key, the others take the rest of the line
+_LLM_FIELDS = ("severity", "hypothesis", "evidence", "confidence")
+_NUMERIC_FIELDS = ("severity", "confidence")
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+_NUMBER_BYTES_RE = re.compile(rb'\d+(?:\.\d+)?')
+_TEXT_STRIP = " \t\r*_"  # Whitespace and markdown emphasis around text values
+_FIELD_RE = re.compile(
+    r'severity[*_]*[:\s][:\s*_]*(?P<severity>\d+(?:\.\d+)?)'
+    r'|confidence[*_]*[:\s][:\s*_]*(?P<confidence>\d+(?:\.\d+)?)'
+    # Text values are captured in a lookahead so later keys on the same line still match
+    r'|hypothesis[*_]*:(?=(?P<hypothesis>[^\n]*))'
+    r'|evidence[*_]*:(?=(?P<evidence>[^\n]*))',
+    re.IGNORECASE
+)
+
+if HYPERSCAN_AVAILABLE:
+    # The same keys matched together in one compiled scan (numeric keys end on their first digit)
+    _FIELD_DB = hyperscan.Database()
+    _FIELD_DB.compile(
+        expressions=[
+            (rf'{field}[*_]*[:\s][:\s*_]*\d' if field in _NUMERIC_FIELDS else rf'{field}[*_]*:').encode()
+            for field in _LLM_FIELDS
+        ],
+        ids=list(range(len(_LLM_FIELDS))),
+        elements=len(_LLM_FIELDS),
+        flags=hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH
+    )
+
+
+def _scan_fields(llm_response: str) -> Dict[str, Optional[str]]:
+    """First value of each field, from one hyperscan pass"""
+
+    raw = llm_response.encode()
+    parsed = dict.fromkeys(_LLM_FIELDS)
+
+    def on_match(field_id, start, end, flags, context):
+        field = _LLM_FIELDS[field_id]
+        if field in _NUMERIC_FIELDS:
+            value = _NUMBER_BYTES_RE.match(raw, end - 1).group()
+        else:
+            line_end = raw.find(b"\n", end)
+            value = raw[end:line_end if line_end != -1 else len(raw)]
+        parsed[field] = value.decode(errors="replace").strip(_TEXT_STRIP)
+        return None not in parsed.values()  # True stops the scan
+
+    try:
+        _FIELD_DB.scan(raw, match_event_handler=on_match)
+    except hyperscan.ScanTerminated:
+        pass  # Every field found before the end of the response
+    return parsed
+
+
+def _analysis_dtype(data: np.ndarray, metadata: Dict[str, Any]) -> np.dtype:
+    """
+    Element type to analyze data in
+
+    metadata["analysis_dtype"] wins when given. Otherwise ANALYSIS_DTYPE,
+    unless data is stored wider and float32 would round away the deltas
+    between its values.
+    """
+    if "analysis_dtype" in metadata:
+        return np.dtype(metadata["analysis_dtype"])
+    if data.dtype == ANALYSIS_DTYPE or data.size == 0:
+        return np.dtype(ANALYSIS_DTYPE)
+
+    lo, hi = float(np.min(data)), float(np.max(data))
+    if max(abs(lo), abs(hi)) > FLOAT32_MAX_MAGNITUDE_RATIO * (hi - lo):
+        return np.dtype(np.float64)
+    return np.dtype(ANALYSIS_DTYPE)
+
+
+@functools.lru_cache(maxsize=512)
+def _hypotheses_for(cluster_count: int, high_variance: bool, source: Optional[str]) -> Tuple[str, ...]:
+    """Hypothesis texts for the discrete features they depend on (cluster count capped at 6)"""
+
+    hypotheses = []
+
+    # Hypothesis 1: Based on anomaly pattern
+    if cluster_count == 1:
+        hypotheses.append("Isolated incident - likely single event trigger")
+    elif cluster_count > 5:
+        hypotheses.append("Recurring pattern - systematic issue or cyclic load")
+    else:
+        hypotheses.append("Multiple incidents - correlated events or cascading failure")
+
+    # Hypothesis 2: Based on data characteristics
+    if high_variance:
+        hypotheses.append("High variance - resource contention or unstable system")
+    else:
+        hypotheses.append("Low variance - external trigger or input spike")
+
+    # Hypothesis 3: From metadata (if available)
+    if source is not None:
+        hypotheses.append(f"Source: {source} - check upstream dependencies")
+
+    return tuple(hypotheses)
+
+
+def _cluster_representatives(data: np.ndarray, lower_bound: float, upper_bound: float,
+                             max_clusters: int) -> np.ndarray:
+    """
+    First index of each run of out-of-bounds values (runs split on gaps > 5),
+    up to max_clusters, from a single scan with no intermediate arrays
+    """
+    representatives = np.empty(max_clusters, dtype=np.int64)
+    count = 0
+    last = -1
+    for i in range(data.shape[0]):
+        if data[i] < lower_bound or data[i] > upper_bound:
+            if last < 0 or i - last > 5:
+                if count == max_clusters:
+                    break
+                representatives[count] = i
+                count += 1
+            last = i
+    return representatives[:count]
+
+
+if NUMBA_AVAILABLE:
+    # Compiled in-process on first call (no fastmath: keeps NaN/inf comparisons exact)
+    _cluster_representatives = njit(_cluster_representatives)
 
 
 class RootCauseAgent:
@@ -36,6 +196,7 @@ class RootCauseAgent:
         self.stackai = stackai_client
         self.model = "anthropic/claude-sonnet-4-5"  # Claude 4.5 Sonnet via Stack AI
         self.name = "root_cause"
+        self._llm_cache: Dict[bytes, str] = {}
 
     @weave_op_if_available()
     @sentry_sdk.trace
@@ -72,7 +233,8 @@ class RootCauseAgent:
                 op="root_cause.analysis",
                 description="Anomaly clustering and correlation"
             ) as rc_span:
-                rc_result = self._root_cause_analysis(data, context)
+                # Numeric work runs off the event loop so the other agents keep moving
+                rc_result = await asyncio.to_thread(self._root_cause_analysis, data, context)
                 rc_span.set_data("anomaly_clusters", len(rc_result["anomaly_clusters"]))
                 rc_span.set_data("hypotheses_generated", len(rc_result["hypotheses"]))
                 rc_span.set_data("correlation_strength", rc_result["correlation_strength"])
@@ -85,45 +247,94 @@ class RootCauseAgent:
                 op="ai.llm.call",
                 description=f"LLM hypothesis reasoning via {self.model}"
             ) as llm_span:
+                # Put the request in flight first; the bookkeeping below doesn't need its answer
+                llm_task = asyncio.create_task(self._get_llm_analysis(prompt))
+
                 llm_span.set_data("model", self.model)
                 llm_span.set_data("prompt_length", len(prompt))
                 llm_span.set_data("has_senso_context", bool(senso_context))
 
-                llm_analysis = await self._get_llm_analysis(prompt)
+                evidence = {
+                    "anomaly_indices": rc_result["anomaly_clusters"],
+                    "hypotheses": rc_result["hypotheses"],
+                    "correlation_strength": rc_result["correlation_strength"]
+                }
+
+                llm_analysis = await llm_task
 
                 llm_span.set_data("response_length", len(llm_analysis))
 
-            # Extract severity and confidence
-            severity = self._extract_severity(llm_analysis)
-            confidence = self._calculate_confidence(rc_result, llm_analysis)
+            # Extract severity and confidence from a single parse of the response
+            parsed = self._parse_llm(llm_analysis)
+            severity = self._extract_severity(parsed)
+            confidence = self._calculate_confidence(rc_result, parsed)
 
             agent_span.set_data("severity", severity)
             agent_span.set_data("confidence", confidence)
 
             return {
                 "agent_name": self.name,
-                "finding": self._format_finding(rc_result, llm_analysis),
+                "finding": self._format_finding(rc_result, parsed),
                 "confidence": confidence,
                 "severity": severity,
-                "evidence": {
-                    "anomaly_indices": rc_result["anomaly_clusters"],
-                    "hypotheses": rc_result["hypotheses"],
-                    "correlation_strength": rc_result["correlation_strength"]
-                }
+                "evidence": evidence
             }
 
+    @classmethod
+    async def analyze_batch(
+        cls,
+        pairs: Iterable[Tuple["RootCauseAgent", Dict[str, Any]]],
+        max_concurrency: int = MAX_CONCURRENT_ANALYSES
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze several (agent, context) pairs concurrently
+
+        All analyses are submitted up front and awaited together, with at
+        most max_concurrency in flight. Results are returned in input order.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def analyze_limited(agent, context):
+            async with semaphore:
+                return await agent.analyze(context)
+
+        return await asyncio.gather(*(
+            analyze_limited(agent, context) for agent, context in pairs
+        ))
+
     def _root_cause_analysis(self, data: np.ndarray, context: Dict[str, Any]) -> Dict[str, Any]:
         """Perform root cause analysis"""
 
+        # One contiguous copy in the analysis dtype, shared by every step below
+        data = np.asarray(data)
+        data = np.ascontiguousarray(data, dtype=_analysis_dtype(data, context.get("metadata") or {}))
+        if data.size and np.ptp(data) == 0:
+            # Constant signal: no outliers or autocorrelation to find, skip the quantile partition
+            return self._constant_result(data, context)
+
+        # Shared statistics, computed once for all the steps below
+        stats = self._compute_stats(data)
+
         # Cluster anomalies (temporal proximity)
-        anomaly_indices = self._identify_anomalies(data)
-        clusters = self._cluster_anomalies(anomaly_indices)
+        if NUMBA_AVAILABLE:
+            # IQR outlier scan and clustering fused into one compiled pass
+            iqr = stats["q3"] - stats["q1"]
+            clusters = _cluster_representatives(
+                data,
+                float(stats["q1"] - 1.5 * iqr),
+                float(stats["q3"] + 1.5 * iqr),
+                10
+            )
+        else:
+            anomaly_indices = self._identify_anomalies(data, stats=stats)
+            clusters = self._cluster_anomalies(anomaly_indices)
+        clusters = clusters.tolist()  # At most 10 representatives cross into Python ints
 
         # Correlation analysis
-        correlation_strength = self._correlation_analysis(data)
+        correlation_strength = self._correlation_analysis(data, stats=stats)
 
         # Generate hypotheses based on patterns
-        hypotheses = self._generate_hypotheses(data, clusters, context)
+        hypotheses = self._generate_hypotheses(data, clusters, context, stats=stats)
 
         return {
             "anomaly_clusters": clusters,
@@ -132,95 +343,97 @@ class RootCauseAgent:
             "correlation_strength": correlation_strength
         }
 
-    def _identify_anomalies(self, data: np.ndarray) -> List[int]:
+    def _constant_result(self, data: np.ndarray, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Root cause result for a constant series, matching what the full analysis yields"""
+
+        stats = {"mean": data[0], "std": 0.0}
+        return {
+            "anomaly_clusters": [],
+            "cluster_count": 0,
+            "hypotheses": self._generate_hypotheses(data, [], context, stats=stats),
+            "correlation_strength": 0.0
+        }
+
+    def _compute_stats(self, data: np.ndarray) -> Dict[str, Any]:
+        """Mean, std, quartiles and mean-centered copy of data, shared by the analysis steps"""
+
+        data = np.asarray(data)
+        mean = np.mean(data)
+        centered = data - mean
+        std = np.sqrt((centered @ centered) / len(data))  # Reuses centered, no extra pass
+        q1, q3 = np.quantile(data, (0.25, 0.75), method='linear')  # One partition for both
+        return {"mean": mean, "std": std, "q1": q1, "q3": q3, "centered": centered}
+
+    def _identify_anomalies(self, data: np.ndarray, stats: Optional[Dict[str, Any]] = None) -> np.ndarray:
         """Identify anomaly indices using IQR method"""
 
-        q1 = np.percentile(data, 25)
-        q3 = np.percentile(data, 75)
+        data = np.asarray(data)
+        if stats is None:
+            stats = self._compute_stats(data)
+        q1, q3 = stats["q1"], stats["q3"]
         iqr = q3 - q1
 
         lower_bound = q1 - 1.5 * iqr
         upper_bound = q3 + 1.5 * iqr
 
-        anomalies = []
-        for i, value in enumerate(data):
-            if value < lower_bound or value > upper_bound:
-                anomalies.append(i)
-
-        return anomalies
+        # One vectorized compare over the whole series instead of a per-value loop
+        outside = (data < lower_bound) | (data > upper_bound)
+        return np.flatnonzero(outside)
 
-    def _cluster_anomalies(self, anomaly_indices: List[int]) -> List[int]:
+    def _cluster_anomalies(self, anomaly_indices: np.ndarray) -> np.ndarray:
         """Cluster anomalies by temporal proximity"""
 
-        if not anomaly_indices:
-            return []
-
-        # Simple clustering: anomalies within 5 indices are in same cluster
-        clusters = []
-        current_cluster = [anomaly_indices[0]]
-
-        for i in range(1, len(anomaly_indices)):
-            if anomaly_indices[i] - anomaly_indices[i-1] <= 5:
-                current_cluster.append(anomaly_indices[i])
-            else:
-                clusters.append(current_cluster[0])  # Representative index
-                current_cluster = [anomaly_indices[i]]
+        indices = np.asarray(anomaly_indices, dtype=np.int64)
+        if indices.size == 0:
+            return indices
 
-        if current_cluster:
-            clusters.append(current_cluster[0])
+        # Simple clustering: anomalies within 5 indices are in same cluster;
+        # a cluster starts wherever the gap to the previous anomaly exceeds 5
+        starts = np.concatenate(([True], np.diff(indices) > 5))
+        return indices[starts][:10]  # Representative index, top 10 clusters
 
-        return clusters[:10]  # Top 10 clusters
-
-    def _correlation_analysis(self, data: np.ndarray) -> float:
+    def _correlation_analysis(self, data: np.ndarray, stats: Optional[Dict[str, Any]] = None) -> float:
         """Analyze auto-correlation strength"""
 
         if len(data) < 10:
             return 0.0
 
-        # Simple lag-1 autocorrelation
-        data_mean = np.mean(data)
-        numerator = np.sum((data[:-1] - data_mean) * (data[1:] - data_mean))
-        denominator = np.sum((data - data_mean) ** 2)
+        # Simple lag-1 autocorrelation (dot products over one centered copy)
+        centered = stats["centered"] if stats is not None else data - np.mean(data)
+        denominator = centered @ centered
 
         if denominator == 0:
             return 0.0
 
-        correlation = numerator / denominator
+        correlation = (centered[:-1] @ centered[1:]) / denominator
         return float(abs(correlation))
 
     def _generate_hypotheses(
         self,
         data: np.ndarray,
         clusters: List[int],
-        context: Dict[str, Any]
+        context: Dict[str, Any],
+        stats: Optional[Dict[str, Any]] = None
     ) -> List[str]:
         """Generate root cause hypotheses"""
 
-        hypotheses = []
-
-        # Hypothesis 1: Based on anomaly pattern
-        if len(clusters) == 1:
-            hypotheses.append("Isolated incident - likely single event trigger")
-        elif len(clusters) > 5:
-            hypotheses.append("Recurring pattern - systematic issue or cyclic load")
+        metadata = context.get("metadata") or {}
+        if "stats" in metadata:
+            mean_val, std_val = np.asarray(metadata["stats"], dtype=np.float64)
+        elif stats is not None:
+            mean_val, std_val = stats["mean"], stats["std"]
         else:
-            hypotheses.append("Multiple incidents - correlated events or cascading failure")
-
-        # Hypothesis 2: Based on data characteristics
-        mean_val = np.mean(data)
-        std_val = np.std(data)
-        if std_val / mean_val > 0.5:  # High coefficient of variation
-            hypotheses.append("High variance - resource contention or unstable system")
+            mean_val = np.mean(data)
+            std_val = np.std(data)
+        # Zero mean: any spread is an unbounded coefficient of variation
+        if mean_val != 0:
+            cv = std_val / mean_val
         else:
-            hypotheses.append("Low variance - external trigger or input spike")
-
-        # Hypothesis 3: From metadata (if available)
-        metadata = context.get("metadata", {})
-        if "source" in metadata:
-            source = metadata["source"]
-            hypotheses.append(f"Source: {source} - check upstream dependencies")
+            cv = np.inf if std_val > 0 else 0.0
+        source = f"{metadata['source']}" if "source" in metadata else None
 
-        return hypotheses
+        # Texts depend only on these discrete features, so repeats hit the cache
+        return list(_hypotheses_for(min(len(clusters), 6), bool(cv > 0.5), source))  # cv > 0.5: high variation
 
     def _build_prompt(self, rc_result: Dict[str, Any], context: Dict[str, Any]) -> str:
         """Build prompt for o1-mini reasoning"""
@@ -278,35 +491,87 @@ Confidence: [0.0-1.0]
             # Fallback: rule-based hypothesis
             return "Severity: 7\nHypothesis: System resource spike\nEvidence: Temporal clustering\nConfidence: 0.6"
 
+        # The prompt renders every input (clusters, rounded correlation,
+        # hypotheses, knowledge base context), so identical prompts share an answer
+        key = hashlib.blake2b(prompt.encode(), digest_size=16).digest()
+        cached = self._llm_cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
-            response = await self.stackai.complete(
-                model=self.model,
-                prompt=prompt,
-                temperature=0.3,  # Lower for reasoning
-                max_tokens=600
-            )
-            return response
+            response = await self._complete_with_retry(prompt)
         except Exception as e:
             print(f"[WARN] StackAI call failed: {e}")
             return "Severity: 5\nHypothesis: Unable to determine\nEvidence: Analysis failed\nConfidence: 0.3"
 
-    def _extract_severity(self, llm_response: str) -> int:
-        """Extract severity score from LLM response"""
+        # Only keep real answers, not a gateway's fallback text
+        if "hypothesis:" in response.lower():
+            if len(self._llm_cache) >= LLM_CACHE_SIZE:
+                del self._llm_cache[next(iter(self._llm_cache))]
+            self._llm_cache[key] = response
+        return response
+
+    async def _complete_with_retry(self, prompt: str) -> str:
+        """
+        StackAI completion with a per-attempt timeout and exponential backoff on transient errors
 
-        import re
-        match = re.search(r'severity[:\s]+(\d+)', llm_response.lower())
+        Earlier attempts ask the gateway to raise StackAITransientError
+        rather than fall back; the last attempt takes its usual fallback
+        """
+
+        delay = LLM_RETRY_BACKOFF_SECONDS
+        for attempt in range(1, LLM_RETRY_ATTEMPTS + 1):
+            try:
+                return await asyncio.wait_for(
+                    self.stackai.complete(
+                        model=self.model,
+                        prompt=prompt,
+                        temperature=0.3,  # Lower for reasoning
+                        max_tokens=600,
+                        raise_on_transient=attempt < LLM_RETRY_ATTEMPTS
+                    ),
+                    timeout=LLM_TIMEOUT_SECONDS
+                )
+            except _RETRYABLE_ERRORS as e:
+                if attempt == LLM_RETRY_ATTEMPTS:
+                    raise
+                print(f"[WARN] StackAI call failed ({type(e).__name__}), retry {attempt}/{LLM_RETRY_ATTEMPTS - 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    def _parse_llm(self, llm_response: str) -> Dict[str, Optional[str]]:
+        """Split LLM response into its severity/hypothesis/evidence/confidence fields in one pass"""
+
+        if HYPERSCAN_AVAILABLE:
+            return _scan_fields(llm_response)
+
+        parsed = dict.fromkeys(_LLM_FIELDS)
+        missing = len(parsed)
+        for match in _FIELD_RE.finditer(llm_response):
+            # Each match sets exactly one named group; the first value of a field wins
+            field = match.lastgroup
+            if parsed[field] is None:
+                parsed[field] = match.group(field).strip(_TEXT_STRIP)
+                missing -= 1
+                if not missing:
+                    break  # Every field seen: skip the rest of the response
+        return parsed
+
+    def _extract_severity(self, parsed: Dict[str, Optional[str]]) -> int:
+        """Severity score from the parsed LLM response"""
+
+        match = _NUMBER_RE.match(parsed["severity"] or "")
         if match:
-            return min(10, max(1, int(match.group(1))))
+            return min(10, max(1, int(float(match.group()))))
         return 6  # Default slightly higher (root cause = more serious)
 
-    def _calculate_confidence(self, rc_result: Dict[str, Any], llm_response: str) -> float:
+    def _calculate_confidence(self, rc_result: Dict[str, Any], parsed: Dict[str, Optional[str]]) -> float:
         """Calculate confidence based on evidence strength"""
 
         # Try to extract confidence from LLM response
-        import re
-        conf_match = re.search(r'confidence[:\s]+([\d.]+)', llm_response.lower())
-        if conf_match:
-            llm_confidence = float(conf_match.group(1))
+        match = _NUMBER_RE.match(parsed["confidence"] or "")
+        if match:
+            llm_confidence = float(match.group())
         else:
             llm_confidence = 0.5
 
@@ -323,13 +588,12 @@ Confidence: [0.0-1.0]
 
         return min(1.0, max(0.0, llm_confidence))
 
-    def _format_finding(self, rc_result: Dict[str, Any], llm_analysis: str) -> str:
+    def _format_finding(self, rc_result: Dict[str, Any], parsed: Dict[str, Optional[str]]) -> str:
         """Format final finding"""
 
-        # Extract hypothesis from LLM
-        hyp_match = llm_analysis.split("Hypothesis:")
-        if len(hyp_match) > 1:
-            hypothesis = hyp_match[1].split("\n")[0].strip()
+        # Hypothesis from LLM, else the top generated one
+        if parsed["hypothesis"] is not None:
+            hypothesis = parsed["hypothesis"]
         else:
             hypothesis = rc_result["hypotheses"][0] if rc_result["hypotheses"] else "Unknown root cause"
 
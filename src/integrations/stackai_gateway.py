@@ -7,7 +7,19 @@ import aiohttp
 import os
 from typing import Dict, Any, Optional
 import asyncio
-import openai
+from openai import OpenAI
+
+
+# HTTP statuses that mean "try again later": rate limited or server-side failure
+_TRANSIENT_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class StackAITransientError(Exception):
+    """Stack AI was rate limited, failing or unreachable; the same request may succeed later"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status  # HTTP status, None for connection errors and timeouts
 
 
 class StackAIGateway:
@@ -50,9 +62,11 @@ class StackAIGateway:
         self.session: Optional[aiohttp.ClientSession] = None
 
     async def create_session(self):
-        """Create aiohttp session"""
+        """Create aiohttp session (reused across calls until close())"""
         if not self.session or self.session.closed:
             self.session = aiohttp.ClientSession(
+                # Keep-alive pool shared by all agents: skips TCP/TLS setup per call
+                connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=60),
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
                     "Content-Type": "application/json"
@@ -66,6 +80,7 @@ class StackAIGateway:
         prompt: str,
         temperature: float = 0.7,
         max_tokens: int = 1000,
+        raise_on_transient: bool = False,
         **kwargs
     ) -> str:
         """
@@ -76,6 +91,9 @@ class StackAIGateway:
             prompt: Input prompt
             temperature: Sampling temperature (ignored for flows)
             max_tokens: Maximum response tokens (ignored for flows)
+            raise_on_transient: Raise StackAITransientError on 429/5xx,
+                connection errors and timeouts instead of falling back, so
+                the caller can retry (other failures still fall back)
             **kwargs: Additional model parameters
 
         Returns:
@@ -83,13 +101,13 @@ class StackAIGateway:
         """
 
         if not self.api_key:
-            return self._fallback_response(model, prompt)
+            return await self._fallback(model, prompt)
 
         # Get flow ID for this model
         flow_id = self.flow_map.get(model)
         if not flow_id:
             # Silently use fallback for models without flows (Change Detective uses local analysis)
-            return self._fallback_response(model, prompt)
+            return await self._fallback(model, prompt)
 
         await self.create_session()
 
@@ -106,8 +124,12 @@ class StackAIGateway:
             async with self.session.post(flow_url, json=payload) as response:
                 if response.status != 200:
                     error_text = await response.text()
+                    if raise_on_transient and response.status in _TRANSIENT_STATUSES:
+                        raise StackAITransientError(
+                            f"Stack AI flow error ({response.status}): {error_text}", response.status
+                        )
                     print(f"[ERROR] Stack AI flow error ({response.status}): {error_text}")
-                    return self._fallback_response(model, prompt)
+                    return await self._fallback(model, prompt)
 
                 data = await response.json()
 
@@ -120,15 +142,36 @@ class StackAIGateway:
                     return data["out-0"]
                 else:
                     print(f"[WARN] Unexpected Stack AI response format: {data}")
-                    return self._fallback_response(model, prompt)
+                    return await self._fallback(model, prompt)
+
+        except StackAITransientError:
+            raise
 
         except asyncio.TimeoutError:
+            if raise_on_transient:
+                raise StackAITransientError(f"Stack AI request timeout for {model}")
             print(f"[ERROR] Stack AI request timeout for {model}")
-            return self._fallback_response(model, prompt)
+            return await self._fallback(model, prompt)
+
+        except aiohttp.ClientConnectionError as e:
+            if raise_on_transient:
+                raise StackAITransientError(f"Stack AI connection failed: {e}") from e
+            print(f"[ERROR] Stack AI request failed: {e}")
+            return await self._fallback(model, prompt)
 
         except Exception as e:
             print(f"[ERROR] Stack AI request failed: {e}")
-            return self._fallback_response(model, prompt)
+            return await self._fallback(model, prompt)
+
+    async def _fallback(self, model: str, prompt: str) -> str:
+        """
+        _fallback_response on a worker thread
+
+        The OpenAI fallback is a blocking call: off the event loop it doesn't
+        stall other agents, and a caller's timeout stops waiting on it (the
+        thread itself runs to completion)
+        """
+        return await asyncio.to_thread(self._fallback_response, model, prompt)
 
     def _fallback_response(self, model: str, prompt: str) -> str:
         """Fallback response using direct OpenAI API when Stack AI unavailable"""
@@ -140,13 +183,12 @@ class StackAIGateway:
                 return "Severity: 5\nAnalysis: Fallback failed - no OpenAI API key"
 
             # Set OpenAI client
-            from openai import OpenAI
             client = OpenAI(api_key=openai_api_key)
 
             # Choose appropriate OpenAI model based on original request
             fallback_model = "gpt-4o-mini"  # Fast and cheap fallback
 
-            # Make synchronous OpenAI call (in fallback path, acceptable)
+            # Synchronous OpenAI call: complete() runs this on a worker thread
             response = client.chat.completions.create(
                 model=fallback_model,
                 messages=[{"role": "user", "content": prompt}],
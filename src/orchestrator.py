@@ -5,12 +5,14 @@ Based on Corch sequential collaboration (73% quality pass rate)
 """
 
 import asyncio
+import contextvars
 import json
 import os
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, asdict
 from datetime import datetime
 import numpy as np
+import orjson
 
 # Environment
 from dotenv import load_dotenv
@@ -103,6 +105,142 @@ class AnomalyVerdict:
     timestamp: str
 
 
+# Model answering the combined prompt (the one with a deployed StackAI flow)
+COMBINED_MODEL = "anthropic/claude-sonnet-4-5"
+
+# Prompt batch of the investigation the current agent task belongs to
+_prompt_batch: contextvars.ContextVar = contextvars.ContextVar("prompt_batch", default=None)
+
+
+class _PromptBatch:
+    """LLM requests from one investigation's agents, awaiting a combined call"""
+
+    def __init__(self, agent_count: int):
+        self.running = agent_count  # Agents that have not finished analyze()
+        self.requests = []  # (kwargs, future) per queued complete() call
+        self.sent = False
+        self.task = None  # Combined call in flight (kept referenced)
+
+
+class CombinedPromptGateway:
+    """
+    Wraps the StackAI gateway so one investigation makes a single LLM call
+
+    During _run_agents_parallel each agent's complete() is queued. Once every
+    running agent has asked, all prompts go to COMBINED_MODEL together, and
+    the JSON reply is split back out per agent. Calls outside a batch, lone
+    requests and unparseable replies use the agent's own request instead.
+    """
+
+    def __init__(self, gateway):
+        self.gateway = gateway
+
+    @staticmethod
+    def supports(gateway) -> bool:
+        """
+        Whether gateway can answer the combined prompt
+
+        Only a keyed gateway with a flow for COMBINED_MODEL qualifies; in
+        fallback mode the reply is never the requested JSON.
+        """
+        return bool(getattr(gateway, "api_key", None)) and COMBINED_MODEL in getattr(gateway, "flow_map", {})
+
+    def __getattr__(self, name):
+        # close(), session, flow_map, ... come from the wrapped gateway
+        return getattr(self.gateway, name)
+
+    async def complete(self, model: str, prompt: str, **kwargs) -> str:
+        """Queue the request in the current batch, or send it directly"""
+
+        batch = _prompt_batch.get()
+        if batch is None or batch.sent:
+            return await self.gateway.complete(model=model, prompt=prompt, **kwargs)
+
+        request = dict(kwargs, model=model, prompt=prompt)
+        future = asyncio.get_running_loop().create_future()
+        batch.requests.append((request, future))
+        self._send_if_ready(batch)
+
+        try:
+            response = await future
+        except asyncio.CancelledError:
+            # Caller gave up (e.g. timed out) before the batch went out: drop its request
+            if not batch.sent:
+                batch.requests.remove((request, future))
+            raise
+        if response is None:
+            # Combined answer unavailable: fall back to this agent's own call
+            return await self.gateway.complete(**request)
+        return response
+
+    def agent_finished(self, batch: _PromptBatch):
+        """Stop waiting on an agent (it may finish without calling the LLM)"""
+        batch.running -= 1
+        self._send_if_ready(batch)
+
+    def _send_if_ready(self, batch: _PromptBatch):
+        if not batch.sent and batch.requests and len(batch.requests) >= batch.running:
+            batch.sent = True
+            batch.task = asyncio.create_task(self._send(batch.requests))
+
+    async def _send(self, requests: List[tuple]):
+        """Resolve every queued request from one combined completion"""
+
+        answers = None
+        if len(requests) > 1:
+            prompts = [request["prompt"] for request, _ in requests]
+            try:
+                reply = await self.gateway.complete(
+                    model=COMBINED_MODEL,
+                    prompt=self._combined_prompt(prompts),
+                    temperature=min(request.get("temperature", 0.7) for request, _ in requests),
+                    max_tokens=sum(request.get("max_tokens", 1000) for request, _ in requests)
+                )
+                answers = self._split_reply(reply, len(prompts))
+            except Exception as e:
+                print(f"[WARN] Combined LLM call failed: {e}")
+
+            if answers is None:
+                print("[WARN] Combined LLM reply unusable - falling back to per-agent calls")
+
+        for i, (_, future) in enumerate(requests):
+            if not future.done():  # Skip callers that stopped waiting
+                future.set_result(answers[i] if answers else None)
+
+    def _combined_prompt(self, prompts: List[str]) -> str:
+        """Embed each agent's prompt under its own key"""
+
+        keys = [f"analysis_{i}" for i in range(1, len(prompts) + 1)]
+        sections = "\n\n".join(
+            f"### {key}\n{prompt.strip()}" for key, prompt in zip(keys, prompts)
+        )
+        return (
+            f"You are answering {len(prompts)} independent anomaly analysis requests.\n"
+            "Answer each one on its own, exactly in the format that request asks for.\n\n"
+            f"{sections}\n\n"
+            "Respond with ONLY a JSON object mapping each request key to its full answer as a string:\n"
+            + json.dumps({key: "..." for key in keys})
+        )
+
+    def _split_reply(self, reply: str, count: int) -> Optional[List[str]]:
+        """Per-request answers from the JSON reply, or None if it is unusable"""
+
+        start, end = reply.find("{"), reply.rfind("}")
+        if start < 0 or end < start:
+            return None
+        try:
+            parsed = orjson.loads(reply[start:end + 1])
+        except orjson.JSONDecodeError:
+            return None
+        if not isinstance(parsed, dict):
+            return None
+
+        answers = [parsed.get(f"analysis_{i}") for i in range(1, count + 1)]
+        if not all(isinstance(answer, str) and answer for answer in answers):
+            return None
+        return answers
+
+
 class AnomalyOrchestrator:
     """
     Orchestrates 3 specialized agents for anomaly detection
@@ -114,14 +252,23 @@ class AnomalyOrchestrator:
     4. Synthesis - Confidence-weighted voting
     """
 
-    def __init__(self, stackai_client=None):
+    def __init__(self, stackai_client=None, combine_prompts: bool = True):
         """
         Initialize orchestrator
 
         Args:
             stackai_client: StackAI gateway for model routing (optional)
+            combine_prompts: Send all agents' LLM prompts as one request (only
+                when the gateway has an API key and a COMBINED_MODEL flow)
         """
         self.stackai = stackai_client
+        # Agents talk to the gateway through the combining wrapper when enabled
+        # and the gateway can serve COMBINED_MODEL; otherwise they call it directly
+        self.llm = (
+            CombinedPromptGateway(stackai_client)
+            if combine_prompts and CombinedPromptGateway.supports(stackai_client)
+            else stackai_client
+        )
         self.agents = []
         self.learner = AutonomousLearner()  # Autonomous learning engine
 
@@ -144,19 +291,14 @@ class AnomalyOrchestrator:
     def _load_agents(self):
         """Lazy load agents to avoid import issues"""
         try:
-            try:
-                from .agents.pattern_analyst import PatternAnalyst
-                from .agents.change_detective import ChangeDetective
-                from .agents.root_cause_agent import RootCauseAgent
-            except ImportError:
-                from agents.pattern_analyst import PatternAnalyst
-                from agents.change_detective import ChangeDetective
-                from agents.root_cause_agent import RootCauseAgent
+            from .agents.pattern_analyst import PatternAnalyst
+            from .agents.change_detective import ChangeDetective
+            from .agents.root_cause_agent import RootCauseAgent
 
             self.agents = [
-                PatternAnalyst(self.stackai),
-                ChangeDetective(self.stackai),
-                RootCauseAgent(self.stackai)
+                PatternAnalyst(self.llm),
+                ChangeDetective(self.llm),
+                RootCauseAgent(self.llm)
             ]
             print(f"[OK] Loaded {len(self.agents)} agents")
         except ImportError as e:
@@ -293,9 +435,20 @@ class AnomalyOrchestrator:
             "senso_context": senso_context
         }
 
+        # Agent tasks copy the current context, so they all see this batch
+        batch = _PromptBatch(len(self.agents)) if isinstance(self.llm, CombinedPromptGateway) else None
+        token = _prompt_batch.set(batch)
+
+        async def analyze(agent):
+            try:
+                return await agent.analyze(shared_context)
+            finally:
+                if batch is not None:
+                    self.llm.agent_finished(batch)
+
         # Run agents concurrently
         tasks = [
-            agent.analyze(shared_context)
+            analyze(agent)
             for agent in self.agents
         ]
 
@@ -304,12 +457,15 @@ class AnomalyOrchestrator:
         except Exception as e:
             print(f"[ERROR] Agent execution failed: {e}")
             return []
+        finally:
+            _prompt_batch.reset(token)
 
-        # Convert results to AgentFindings
+        # Convert results to AgentFindings; a failed agent is reported and left
+        # out of the synthesis rather than failing the whole investigation
         findings = []
-        for i, result in enumerate(results):
+        for i, (agent, result) in enumerate(zip(self.agents, results)):
             if isinstance(result, Exception):
-                print(f"[WARN] Agent {i} failed: {result}")
+                print(f"[WARN] Agent {getattr(agent, 'name', i)} failed: {result}")
                 continue
 
             if isinstance(result, dict):
@@ -2,15 +2,16 @@
 """
 TrueFoundry Live Metrics Demo
 Shows real-time Prometheus metrics collection
-"""
 
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent / "src"))
+Run from the repository root:
+    python3 -m tests.demo_truefoundry_metrics
+"""
 
-from integrations.truefoundry_deployment import TrueFoundryDeployment
+import random
 from dataclasses import dataclass
 
+from src.integrations.truefoundry_deployment import TrueFoundryDeployment
+
 # Mock verdict for demonstration
 @dataclass
 class MockVerdict:
@@ -46,26 +47,28 @@ def main():
         ("Critical error spike", 10, 0.98, [200, 201, 202, 203, 204, 205]),
     ]
 
+    verdicts = []
+    performance = []
     for i, (scenario, severity, confidence, anomalies) in enumerate(scenarios, 1):
-        verdict = MockVerdict(
+        print(f"\n[Detection #{i}] {scenario}")
+        verdicts.append(MockVerdict(
             severity=severity,
             confidence=confidence,
             anomalies_detected=anomalies,
             agent_findings=[]
-        )
-
-        print(f"\n[Detection #{i}] {scenario}")
-        tf.log_inference(verdict)
+        ))
 
         # Simulate timing
-        import random
         duration_ms = random.uniform(800, 2000)
         agent_timings = {
             'pattern_analyst': random.uniform(250, 700),
             'change_detective': random.uniform(250, 700),
             'root_cause': random.uniform(250, 700)
         }
-        tf.log_performance(duration_ms, agent_timings)
+        performance.append((duration_ms, agent_timings))
+
+    # One log_metrics call per detection instead of one per metric group
+    tf.log_inference_batch(verdicts, performance)
 
     print()
     print("="*70)
@@ -19,8 +19,7 @@ from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+# Add repository root to path (modules import as src.*)
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.orchestrator import AnomalyOrchestrator, AnomalyContext
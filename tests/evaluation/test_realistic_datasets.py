@@ -11,11 +11,11 @@ import pandas as pd
 from pathlib import Path
 from datetime import datetime
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent / "src"))
+# Add repository root to path (modules import as src.*)
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from orchestrator import AnomalyOrchestrator, AnomalyContext
-from integrations.stackai_gateway import StackAIGateway
+from src.orchestrator import AnomalyOrchestrator, AnomalyContext
+from src.integrations.stackai_gateway import StackAIGateway
 
 
 # Ground truth for each realistic dataset
@@ -0,0 +1,198 @@
+"""
+Test Code Generation Focus
+Validates how pytest worker outcomes map to failures, vulnerability fixer
+dispatch, and the compiled marker count against str.count
+"""
+
+import pytest
+
+import sys
+from pathlib import Path
+# The agents_orig package __init__ needs litellm; this module stands alone
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "agents_orig"))
+
+import code_generation_focus
+from code_generation_focus import CodeGenerationOrchestrator, VulnID
+
+
+CODE = "def first(xs):\n    return xs[1]\n"
+PASSING = "def test_ok():\n    assert first([1, 2]) == 2\n"
+
+
+@pytest.fixture
+def orchestrator():
+    orchestrator = CodeGenerationOrchestrator()
+    yield orchestrator
+    orchestrator.close()
+
+
+@pytest.mark.skipif(not code_generation_focus.PYTEST_AVAILABLE, reason="pytest runner unavailable")
+class TestRunTests:
+    """_run_tests results for each way a generated test run can end"""
+
+    @pytest.mark.asyncio
+    async def test_passing_tests(self, orchestrator):
+        result = await orchestrator._run_tests(CODE, PASSING, "python")
+
+        assert result == {"all_pass": True, "failures": []}
+
+    @pytest.mark.asyncio
+    async def test_failure_points_at_code_line(self, orchestrator):
+        result = await orchestrator._run_tests(CODE, "def test_first():\n    assert first([1]) == 1\n", "python")
+
+        assert result == {
+            "all_pass": False,
+            "failures": [{"test": "test_first", "error": "IndexError: list index out of range", "line": 2}]
+        }
+
+    @pytest.mark.asyncio
+    async def test_collection_error(self, orchestrator):
+        result = await orchestrator._run_tests(CODE, "def test_broken(:\n    pass\n", "python")
+
+        assert not result["all_pass"]
+        [failure] = result["failures"]
+        assert failure["test"].startswith("test_solution_")
+        assert failure["error"] == "SyntaxError: invalid syntax"
+        assert failure["line"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failure_through_eval_frame(self, orchestrator):
+        # The deepest frame is <string>, which has no file behind it
+        code = "def evaluate(expression):\n    return eval(expression)\n"
+        result = await orchestrator._run_tests(code, "def test_a():\n    assert evaluate('1/0') == 1\n", "python")
+
+        assert result == {
+            "all_pass": False,
+            "failures": [{"test": "test_a", "error": "ZeroDivisionError: division by zero", "line": 2}]
+        }
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("tests", ["", "x = 1\n"])
+    async def test_no_tests_is_unverified(self, orchestrator, tests):
+        assert await orchestrator._run_tests(CODE, tests, "python") == {"all_pass": False, "failures": []}
+
+    @pytest.mark.asyncio
+    async def test_unverified_code_is_not_retried(self, orchestrator, monkeypatch):
+        runs = []
+        run_tests = orchestrator._run_tests
+
+        async def counting_run_tests(*args):
+            runs.append(args)
+            return await run_tests(*args)
+
+        monkeypatch.setattr(orchestrator, "_run_tests", counting_run_tests)
+
+        assert await orchestrator._ensure_tests_pass(CODE, "", "python") == CODE
+        assert len(runs) == 1
+
+    @pytest.mark.asyncio
+    async def test_other_language_is_unverified(self, orchestrator):
+        assert await orchestrator._run_tests(CODE, "", "javascript") == {"all_pass": False, "failures": []}
+
+    @pytest.mark.asyncio
+    async def test_hung_run_times_out(self, orchestrator, monkeypatch):
+        monkeypatch.setattr(code_generation_focus, "TEST_TIMEOUT_SECONDS", 1.0)
+        pool = orchestrator._test_pool
+
+        result = await orchestrator._run_tests(CODE, "def test_hang():\n    while True:\n        pass\n", "python")
+
+        assert result == {
+            "all_pass": False,
+            "failures": [{"test": "<session>", "error": "Tests timed out after 1s", "line": 0}]
+        }
+        assert orchestrator._test_pool is not pool
+        assert (await orchestrator._run_tests(CODE, PASSING, "python"))["all_pass"]
+
+    @pytest.mark.asyncio
+    async def test_crashed_worker_replaces_pool(self, orchestrator):
+        pool = orchestrator._test_pool
+
+        result = await orchestrator._run_tests(CODE, "import os\ndef test_die():\n    os._exit(3)\n", "python")
+
+        assert result == {
+            "all_pass": False,
+            "failures": [{"test": "<session>", "error": "Test worker process crashed", "line": 0}]
+        }
+        assert orchestrator._test_pool is not pool
+        assert (await orchestrator._run_tests(CODE, PASSING, "python"))["all_pass"]
+
+
+class TestSecurityFixers:
+    """Scanner VulnIDs dispatch to their fixers through _fixers"""
+
+    SOURCE = (
+        'password = "hunter2"\n'
+        'def lookup(db, name):\n'
+        '    return db.execute(f"SELECT * FROM users WHERE name = {name}")\n'
+    )
+
+    def test_registry_keys_are_vuln_ids(self, orchestrator):
+        assert set(orchestrator._fixers) == {
+            VulnID.SQL_INJECTION, VulnID.XSS, VulnID.PATH_TRAVERSAL, VulnID.HARDCODED_PASSWORD
+        }
+
+    @pytest.mark.asyncio
+    async def test_scanned_issues_are_fixed(self, orchestrator):
+        vulnerabilities = await orchestrator.security_scanner.scan(self.SOURCE, "python")
+        assert vulnerabilities == [VulnID.SQL_INJECTION, VulnID.HARDCODED_PASSWORD]
+
+        fixed = await orchestrator._fix_security_issues(self.SOURCE, vulnerabilities)
+
+        assert fixed.startswith("import os\n")
+        assert 'password = os.getenv("PASSWORD")' in fixed
+        assert 'db.execute("SELECT * FROM users WHERE name = {name}", params)' in fixed
+        assert await orchestrator.security_scanner.scan(fixed, "python") == []
+
+    @pytest.mark.asyncio
+    async def test_only_listed_issues_are_fixed(self, orchestrator):
+        fixed = await orchestrator._fix_security_issues(self.SOURCE, [VulnID.HARDCODED_PASSWORD])
+
+        assert 'password = os.getenv("PASSWORD")' in fixed
+        assert 'execute(f"SELECT' in fixed
+
+    @pytest.mark.asyncio
+    async def test_issue_without_fixer_is_left_alone(self, orchestrator):
+        code = "result = eval(expression)\n"
+
+        assert await orchestrator._fix_security_issues(code, [VulnID.EVAL, VulnID.EXEC, VulnID.OS_SYSTEM]) == code
+
+    def test_vuln_id_reads_as_message(self):
+        assert str(VulnID.SQL_INJECTION) == "Potential SQL injection"
+        assert VulnID("Hardcoded password") is VulnID.HARDCODED_PASSWORD
+
+
+class TestCodeAuditor:
+    """Definition bookkeeping shared by function, async function and class visitors"""
+
+    def test_function_spans_and_class_docstring(self):
+        auditor = code_generation_focus._audit_python(
+            'class Session:\n'
+            '    """Holds the login token"""\n'
+            '    async def refresh(self):\n'
+            '        def retry():\n'
+            '            pass\n'
+            '        return retry\n'
+        )
+
+        assert auditor.func_spans == {"refresh": (3, 6), "retry": (4, 5)}
+        assert auditor.has_documentation
+
+    def test_definition_names_are_noted(self):
+        assert code_generation_focus._audit_python("class TokenStore:\n    pass\n").mentions_token
+        assert code_generation_focus._audit_python("async def new_token():\n    pass\n").mentions_token
+
+
+class TestMarkerCounts:
+    """_marker_counts matches str.count for every marker"""
+
+    @pytest.mark.parametrize("code", [
+        "",
+        "if x:\n    for i in range(3):\n        while f(i)[0]: {}\n",
+        "elif (a) or [b]: pass\nif(\nfor\nwhile",
+        "s = 'ünïcode (if ) {for } [while ]'\n" * 3,
+        TestSecurityFixers.SOURCE,
+    ])
+    def test_matches_str_count(self, code):
+        expected = {marker: code.count(marker) for marker in code_generation_focus._COUNTED_MARKERS}
+
+        assert code_generation_focus._marker_counts(code) == expected
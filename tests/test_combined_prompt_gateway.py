@@ -0,0 +1,181 @@
+"""
+Test Combined Prompt Gateway
+Validates that one investigation's agent prompts go out as a single
+COMBINED_MODEL call, and that every unusable reply falls back to the
+agents' own calls
+"""
+
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.orchestrator import (
+    COMBINED_MODEL,
+    AnomalyContext,
+    AnomalyOrchestrator,
+    CombinedPromptGateway,
+    _PromptBatch,
+    _prompt_batch,
+)
+
+
+AGENT_MODEL = "openai/gpt-4-turbo"
+
+
+class FakeGateway:
+    """Keyed StackAI gateway stand-in that records every complete() call"""
+
+    def __init__(self, combined_reply=None, api_key="test-key", flows=(COMBINED_MODEL, AGENT_MODEL)):
+        self.api_key = api_key
+        self.flow_map = {model: f"flow-{i}" for i, model in enumerate(flows)}
+        self.combined_reply = combined_reply  # str, exception, or None to answer by prompt count
+        self.calls = []
+
+    async def complete(self, model, prompt, **kwargs):
+        self.calls.append({"model": model, "prompt": prompt, **kwargs})
+        await asyncio.sleep(0)
+        if model != COMBINED_MODEL:
+            return f"own answer to {prompt}"
+        if isinstance(self.combined_reply, Exception):
+            raise self.combined_reply
+        if self.combined_reply is not None:
+            return self.combined_reply
+        count = prompt.count("### analysis_")
+        return "Here you go:\n" + json.dumps(
+            {f"analysis_{i}": f"Severity: {i + 5}\nPattern: combined {i}" for i in range(1, count + 1)}
+        )
+
+
+async def run_batch(gateway, prompts, idle_agents=0):
+    """Ask one prompt per agent inside a batch, as _run_agents_parallel does"""
+
+    wrapper = CombinedPromptGateway(gateway)
+    batch = _PromptBatch(len(prompts) + idle_agents)
+    token = _prompt_batch.set(batch)
+
+    async def agent(prompt):
+        try:
+            if prompt is None:
+                return None  # Finished without calling the LLM
+            return await wrapper.complete(model=AGENT_MODEL, prompt=prompt, temperature=0.3, max_tokens=500)
+        finally:
+            wrapper.agent_finished(batch)
+
+    try:
+        return await asyncio.gather(*(agent(prompt) for prompt in list(prompts) + [None] * idle_agents))
+    finally:
+        _prompt_batch.reset(token)
+
+
+class TestSupports:
+    """Combining is only enabled for a gateway that can answer COMBINED_MODEL"""
+
+    def test_keyed_gateway_with_flow(self):
+        assert CombinedPromptGateway.supports(FakeGateway())
+
+    def test_gateway_without_key(self):
+        assert not CombinedPromptGateway.supports(FakeGateway(api_key=None))
+
+    def test_gateway_without_combined_flow(self):
+        assert not CombinedPromptGateway.supports(FakeGateway(flows=(AGENT_MODEL,)))
+
+    def test_no_gateway(self):
+        assert not CombinedPromptGateway.supports(None)
+
+    def test_orchestrator_wraps_only_supported_gateways(self):
+        assert isinstance(AnomalyOrchestrator(stackai_client=FakeGateway()).llm, CombinedPromptGateway)
+
+        unkeyed = FakeGateway(api_key=None)
+        assert AnomalyOrchestrator(stackai_client=unkeyed).llm is unkeyed
+
+        keyed = FakeGateway()
+        assert AnomalyOrchestrator(stackai_client=keyed, combine_prompts=False).llm is keyed
+
+
+class TestSplitReply:
+    """Per-request answers are taken from the JSON object in the reply"""
+
+    @pytest.fixture
+    def wrapper(self):
+        return CombinedPromptGateway(FakeGateway())
+
+    def test_json_inside_prose(self, wrapper):
+        reply = 'Sure:\n```json\n{"analysis_1": "one", "analysis_2": "two {x}"}\n```'
+
+        assert wrapper._split_reply(reply, 2) == ["one", "two {x}"]
+
+    @pytest.mark.parametrize("reply", [
+        "no json here",
+        "} backwards {",
+        '{"analysis_1": "one", }',
+        '["one", "two"]',
+        '{"analysis_1": "one"}',
+        '{"analysis_1": "one", "analysis_2": ""}',
+        '{"analysis_1": "one", "analysis_2": {"severity": 3}}',
+    ])
+    def test_unusable_reply(self, wrapper, reply):
+        assert wrapper._split_reply(reply, 2) is None
+
+
+class TestBatching:
+    """Queued agent requests resolve from one combined call, or fall back"""
+
+    @pytest.mark.asyncio
+    async def test_one_combined_call(self):
+        gateway = FakeGateway()
+
+        answers = await run_batch(gateway, ["first prompt", "second prompt"], idle_agents=1)
+
+        assert [call["model"] for call in gateway.calls] == [COMBINED_MODEL]
+        assert answers[:2] == ["Severity: 6\nPattern: combined 1", "Severity: 7\nPattern: combined 2"]
+        call = gateway.calls[0]
+        assert "### analysis_1\nfirst prompt" in call["prompt"]
+        assert "### analysis_2\nsecond prompt" in call["prompt"]
+        assert call["temperature"] == 0.3
+        assert call["max_tokens"] == 1000
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("reply", ["I cannot answer in JSON", '{"analysis_1": "only one"}', RuntimeError("503")])
+    async def test_unusable_combined_reply_falls_back(self, reply):
+        gateway = FakeGateway(combined_reply=reply)
+
+        answers = await run_batch(gateway, ["first prompt", "second prompt"])
+
+        assert [call["model"] for call in gateway.calls] == [COMBINED_MODEL, AGENT_MODEL, AGENT_MODEL]
+        assert answers == ["own answer to first prompt", "own answer to second prompt"]
+
+    @pytest.mark.asyncio
+    async def test_lone_request_is_sent_as_is(self):
+        gateway = FakeGateway()
+
+        answers = await run_batch(gateway, ["only prompt"], idle_agents=2)
+
+        assert [call["model"] for call in gateway.calls] == [AGENT_MODEL]
+        assert answers[0] == "own answer to only prompt"
+
+    @pytest.mark.asyncio
+    async def test_call_outside_batch_passes_through(self):
+        gateway = FakeGateway()
+
+        answer = await CombinedPromptGateway(gateway).complete(model=AGENT_MODEL, prompt="direct")
+
+        assert answer == "own answer to direct"
+        assert [call["model"] for call in gateway.calls] == [AGENT_MODEL]
+
+    @pytest.mark.asyncio
+    async def test_investigation_agents_share_one_call(self):
+        gateway = FakeGateway()
+        orchestrator = AnomalyOrchestrator(stackai_client=gateway)
+        data = np.r_[np.random.default_rng(0).normal(10, 1, 95), [50, 60, 70, 80, 90]]
+        context = AnomalyContext(data=data, timestamps=None, metadata={"source": "test"})
+
+        findings = await orchestrator._run_agents_parallel(context, None)
+
+        assert len(findings) == len(orchestrator.agents)
+        assert [call["model"] for call in gateway.calls] == [COMBINED_MODEL]
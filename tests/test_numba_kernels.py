@@ -0,0 +1,121 @@
+"""
+Test Numba Kernels
+Validates each compiled kernel against the numpy code it replaces, so the
+fast path and the fallback path report the same anomalies
+"""
+
+import numpy as np
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import evaluations.common as common
+import src.agents.change_detective as change_detective
+import src.agents.pattern_analyst as pattern_analyst
+import src.agents.root_cause_agent as root_cause_agent
+from src.agents.change_detective import ChangeDetective
+from src.agents.root_cause_agent import RootCauseAgent
+
+pytestmark = pytest.mark.skipif(not pattern_analyst.NUMBA_AVAILABLE, reason="numba not installed")
+
+
+def _series():
+    """Series shapes the agents see: noise, spikes, steps, drift, short and flat"""
+
+    rng = np.random.default_rng(42)
+    noise = rng.normal(100, 10, 500)
+
+    spikes = noise.copy()
+    spikes[[40, 43, 200, 201, 202, 490]] += [90, -80, 120, 130, 140, 200]
+
+    step = np.r_[rng.normal(10, 1, 150), rng.normal(40, 1, 150)]
+
+    return {
+        "noise": noise,
+        "spikes": spikes,
+        "step": step,
+        "drift": np.linspace(0, 50, 300) + rng.normal(0, 0.5, 300),
+        "ramp": np.arange(100, dtype=np.float64),
+        "short": np.array([1.0, 2.0, 50.0, 2.0]),
+        "flat": np.full(60, 7.0),
+        "epoch": 1.7e9 + rng.normal(0, 5, 200),
+    }
+
+
+SERIES = _series()
+
+
+@pytest.fixture(params=list(SERIES))
+def data(request):
+    return SERIES[request.param].copy()
+
+
+class TestPatternAnalystMoments:
+    """Welford single pass against np.mean/std/min/max"""
+
+    def test_matches_numpy(self, data):
+        mean, std, lo, hi = pattern_analyst._moments(data)
+
+        assert mean == pytest.approx(np.mean(data), rel=1e-12)
+        assert std == pytest.approx(np.std(data), rel=1e-9, abs=1e-9)
+        assert lo == np.min(data)
+        assert hi == np.max(data)
+
+
+class TestChangeDetectivePoints:
+    """Fused sliding-window kernel against the moving-average/diff branch"""
+
+    def test_matches_numpy_branch(self, data, monkeypatch):
+        detective = ChangeDetective(stackai_client=None)
+        compiled = detective._change_point_analysis(data)
+
+        monkeypatch.setattr(change_detective, "NUMBA_AVAILABLE", False)
+        fallback = detective._change_point_analysis(data)
+
+        assert compiled == fallback
+
+    @pytest.mark.parametrize("window", [2, 5])
+    def test_too_short_for_window(self, window):
+        assert change_detective._change_points(np.ones(window), window).size == 0
+
+
+class TestRootCauseClusters:
+    """Fused IQR scan and clustering against _identify_anomalies + _cluster_anomalies"""
+
+    def test_matches_numpy_branch(self, data, monkeypatch):
+        agent = RootCauseAgent(stackai_client=None)
+        context = {"metadata": {}}
+        compiled = agent._root_cause_analysis(data, context)
+
+        monkeypatch.setattr(root_cause_agent, "NUMBA_AVAILABLE", False)
+        fallback = agent._root_cause_analysis(data, context)
+
+        assert compiled == fallback
+
+    def test_cluster_limit(self):
+        # Outliers every 10 samples: each starts its own cluster, only 10 are kept
+        data = np.zeros(300)
+        data[::10] = 100.0
+        agent = RootCauseAgent(stackai_client=None)
+
+        expected = agent._cluster_anomalies(np.flatnonzero(data))
+
+        assert root_cause_agent._cluster_representatives(data, -1.0, 1.0, 10).tolist() == expected.tolist()
+        assert len(expected) == 10
+
+
+class TestEvaluationBaseline:
+    """Fused baseline shaping against the scale/shift/clip ufuncs"""
+
+    @pytest.mark.parametrize("clip", [None, (90.0, 110.0), (0.0, np.inf)])
+    def test_matches_numpy(self, clip, monkeypatch):
+        tail = [np.array([500.0, 600.0]), np.linspace(1, 2, 5)]
+        compiled = common.build_series(np.random.default_rng(7), 100, 15, 200, tail, clip=clip)
+
+        monkeypatch.setattr(common, "NUMBA_AVAILABLE", False)
+        fallback = common.build_series(np.random.default_rng(7), 100, 15, 200, tail, clip=clip)
+
+        np.testing.assert_allclose(compiled, fallback, rtol=1e-15, atol=0)
+        np.testing.assert_array_equal(compiled[200:], np.concatenate(tail))
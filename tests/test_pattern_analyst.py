@@ -0,0 +1,44 @@
+"""
+Test Pattern Analyst
+Validates that detection's mean/std are reused instead of rescanning the series
+"""
+
+import numpy as np
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import src.agents.pattern_analyst as pattern_analyst
+from src.agents.pattern_analyst import PatternAnalyst
+
+
+class TestStatisticalAnalysis:
+    """Given (mean, std), only min/max are computed from the data"""
+
+    def test_given_stats_skip_moments_pass(self, monkeypatch):
+        data = np.r_[np.random.default_rng(0).normal(100, 10, 200), [400.0]]
+
+        def no_moments(data):
+            raise AssertionError("_moments should not run when stats are given")
+
+        monkeypatch.setattr(pattern_analyst, "_moments", no_moments)
+        result = PatternAnalyst(stackai_client=None)._statistical_analysis(data, (100.0, 10.0))
+
+        assert result["mean"] == 100.0
+        assert result["std"] == 10.0
+        assert result["min"] == data.min()
+        assert result["max"] == 400.0
+        assert result["anomaly_indices"] == [200]
+
+    def test_matches_computed_stats(self):
+        data = np.r_[np.random.default_rng(1).normal(5, 2, 300), [40.0, -30.0]]
+        analyst = PatternAnalyst(stackai_client=None)
+
+        computed = analyst._statistical_analysis(data)
+        given = analyst._statistical_analysis(data, (np.mean(data), np.std(data)))
+
+        for key in ("mean", "std", "min", "max"):
+            assert given[key] == pytest.approx(computed[key], rel=1e-12)
+        assert given["anomaly_indices"] == computed["anomaly_indices"]
@@ -0,0 +1,174 @@
+"""
+Test Root Cause Agent
+Validates LLM response parsing across the shapes LLMs actually return
+(plain, list-formatted, inline prose) and the numeric precision the
+analysis runs at
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import src.agents.root_cause_agent as root_cause_agent
+from src.agents.root_cause_agent import RootCauseAgent
+from src.integrations.stackai_gateway import StackAITransientError
+
+
+# Stand-in analysis result: neutral correlation, one generated hypothesis
+RC_RESULT = {
+    "correlation_strength": 0.5,
+    "hypotheses": ["Generated hypothesis"],
+    "cluster_count": 2
+}
+
+# (response, severity, confidence, hypothesis)
+RESPONSES = [
+    ("Severity: 9\nHypothesis: Disk full\nEvidence: Writes fail\nConfidence: 0.9",
+     9, 0.9, "Disk full"),
+    ("1. Severity: 9\n2. Hypothesis: Disk full\n3. Evidence: Writes fail\n4. Confidence: 0.9",
+     9, 0.9, "Disk full"),
+    ("- Severity: 9\n- Hypothesis: Disk full\n- Confidence: 0.9",
+     9, 0.9, "Disk full"),
+    ("**Severity:** 9\n**Hypothesis:** Disk full\n**Confidence:** 0.9",
+     9, 0.9, "Disk full"),
+    ("The severity: 9 is driven by write errors, Confidence: 0.9 overall.",
+     9, 0.9, "Generated hypothesis"),
+    ("Hypothesis: Disk full. Confidence: 0.8\nSeverity: 7/10",
+     7, 0.8, "Disk full. Confidence: 0.8"),
+    ("Severity justification: sustained errors\nSeverity: 8\nhypothesis: GC pauses\nConfidence: 0.75.",
+     8, 0.75, "GC pauses"),
+    ("No structured answer", 6, 0.5, "Generated hypothesis"),
+]
+
+
+@pytest.fixture(params=["regex", "hyperscan"])
+def agent(request, monkeypatch):
+    """Agent parsing with the regex path, or the hyperscan path when installed"""
+    if request.param == "hyperscan":
+        if not root_cause_agent.HYPERSCAN_AVAILABLE:
+            pytest.skip("hyperscan not installed")
+    else:
+        monkeypatch.setattr(root_cause_agent, "HYPERSCAN_AVAILABLE", False)
+    return RootCauseAgent(stackai_client=None)
+
+
+class TestRootCauseParsing:
+    """Fields extracted from one parse of the LLM response"""
+
+    @pytest.mark.parametrize("response, severity, confidence, hypothesis", RESPONSES)
+    def test_response_shapes(self, agent, response, severity, confidence, hypothesis):
+        parsed = agent._parse_llm(response)
+
+        assert agent._extract_severity(parsed) == severity
+        assert agent._calculate_confidence(RC_RESULT, parsed) == pytest.approx(confidence)
+        assert agent._format_finding(RC_RESULT, parsed).startswith(
+            f"Root cause hypothesis: {hypothesis}. "
+        )
+
+    def test_first_value_wins(self, agent):
+        parsed = agent._parse_llm("Severity: 3\nSeverity: 9\nConfidence: 0.2\nConfidence: 0.7")
+
+        assert parsed["severity"] == "3"
+        assert parsed["confidence"] == "0.2"
+
+    def test_severity_is_clamped(self, agent):
+        assert agent._extract_severity(agent._parse_llm("Severity: 42")) == 10
+        assert agent._extract_severity(agent._parse_llm("Severity: 0")) == 1
+
+    def test_evidence_field(self, agent):
+        parsed = agent._parse_llm("Evidence: three clusters after deploy  \nSeverity: 5")
+
+        assert parsed["evidence"] == "three clusters after deploy"
+
+
+class TestAnalysisDtype:
+    """float32 by default, float64 when the series or the caller needs it"""
+
+    def test_float32_by_default(self):
+        data = np.random.default_rng(0).normal(100, 10, 50)
+
+        assert root_cause_agent._analysis_dtype(data, {}) == np.float32
+
+    def test_float32_input_is_kept(self):
+        data = np.full(50, 1.7e9, dtype=np.float32)
+
+        assert root_cause_agent._analysis_dtype(data, {}) == np.float32
+
+    def test_metadata_opt_out(self):
+        data = np.random.default_rng(0).normal(100, 10, 50)
+
+        assert root_cause_agent._analysis_dtype(data, {"analysis_dtype": "float64"}) == np.float64
+
+    def test_epoch_scale_series_keeps_float64(self):
+        # Deltas of a few units on a ~1e9 baseline vanish in float32 (spacing 128)
+        rng = np.random.default_rng(0)
+        data = 1.7e9 + rng.normal(0, 5, 200)
+        data[[50, 150]] += 100
+
+        assert root_cause_agent._analysis_dtype(data, {}) == np.float64
+
+        result = RootCauseAgent(stackai_client=None)._root_cause_analysis(data, {"metadata": {}})
+        centered = data - data.mean()
+        expected = abs(centered[:-1] @ centered[1:]) / (centered @ centered)
+
+        assert result["anomaly_clusters"] == [50, 150]
+        assert result["correlation_strength"] == pytest.approx(expected)
+
+
+class ScriptedGateway:
+    """Gateway stand-in raising or answering per call, recording raise_on_transient"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.raise_flags = []
+
+    async def complete(self, model, prompt, raise_on_transient=False, **kwargs):
+        self.raise_flags.append(raise_on_transient)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        if outcome is None:
+            await asyncio.sleep(10)  # Hung provider call
+        return outcome
+
+
+class TestLLMRetry:
+    """Transient gateway failures are retried with backoff; others fail fast"""
+
+    ANSWER = "Severity: 8\nHypothesis: Disk full\nConfidence: 0.9"
+
+    @pytest.fixture(autouse=True)
+    def no_backoff(self, monkeypatch):
+        monkeypatch.setattr(root_cause_agent, "LLM_RETRY_BACKOFF_SECONDS", 0)
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_are_retried(self):
+        gateway = ScriptedGateway(StackAITransientError("busy", 503), StackAITransientError("reset"), self.ANSWER)
+
+        response = await RootCauseAgent(stackai_client=gateway)._get_llm_analysis("prompt")
+
+        assert response == self.ANSWER
+        # The last attempt lets the gateway fall back instead of raising
+        assert gateway.raise_flags == [True, True, False]
+
+    @pytest.mark.asyncio
+    async def test_timed_out_attempt_is_retried(self, monkeypatch):
+        monkeypatch.setattr(root_cause_agent, "LLM_TIMEOUT_SECONDS", 0.01)
+        gateway = ScriptedGateway(None, self.ANSWER)
+
+        assert await RootCauseAgent(stackai_client=gateway)._get_llm_analysis("prompt") == self.ANSWER
+        assert len(gateway.raise_flags) == 2
+
+    @pytest.mark.asyncio
+    async def test_other_errors_fail_fast(self):
+        gateway = ScriptedGateway(ValueError("bad request"), self.ANSWER)
+
+        response = await RootCauseAgent(stackai_client=gateway)._get_llm_analysis("prompt")
+
+        assert "Hypothesis: Unable to determine" in response
+        assert len(gateway.raise_flags) == 1
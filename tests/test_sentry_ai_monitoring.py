@@ -13,10 +13,10 @@ import sentry_sdk
 # Test against real orchestrator
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from orchestrator import AnomalyOrchestrator, AnomalyContext
-from integrations.senso_rag import SensoRAG
+from src.orchestrator import AnomalyOrchestrator, AnomalyContext
+from src.integrations.senso_rag import SensoRAG
 
 
 class TestSentryAIMonitoring:
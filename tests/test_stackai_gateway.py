@@ -0,0 +1,130 @@
+"""
+Test StackAI Gateway
+Validates which failures raise StackAITransientError for callers that
+retry, which fall back, and that the blocking fallback stays off the
+event loop
+"""
+
+import asyncio
+import threading
+
+import aiohttp
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.integrations.stackai_gateway import StackAIGateway, StackAITransientError
+
+
+MODEL = "anthropic/claude-sonnet-4-5"
+FALLBACK = "Severity: 5\nAnalysis: Fallback failed - no OpenAI API key"
+
+
+class FakeResponse:
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def text(self):
+        return str(self.body)
+
+    async def json(self):
+        return self.body
+
+
+class FakeSession:
+    """aiohttp session stand-in answering every post() with one status, or raising"""
+
+    closed = False
+
+    def __init__(self, status=200, body=None, error=None):
+        self.status = status
+        self.body = body if body is not None else {"outputs": {"out-0": "Severity: 8"}}
+        self.error = error
+
+    def post(self, url, json):
+        if self.error is not None:
+            raise self.error
+        return FakeResponse(self.status, self.body)
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    return StackAIGateway(api_key="test-key")
+
+
+class TestTransientErrors:
+    """raise_on_transient surfaces retryable failures; everything else falls back"""
+
+    @pytest.mark.asyncio
+    async def test_success(self, gateway):
+        gateway.session = FakeSession()
+
+        assert await gateway.complete(model=MODEL, prompt="p", raise_on_transient=True) == "Severity: 8"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+    async def test_retryable_status_raises(self, gateway, status):
+        gateway.session = FakeSession(status=status, body="busy")
+
+        with pytest.raises(StackAITransientError) as raised:
+            await gateway.complete(model=MODEL, prompt="p", raise_on_transient=True)
+
+        assert raised.value.status == status
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status", [400, 401, 403, 404])
+    async def test_client_error_falls_back(self, gateway, status):
+        gateway.session = FakeSession(status=status, body="bad request")
+
+        assert await gateway.complete(model=MODEL, prompt="p", raise_on_transient=True) == FALLBACK
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("error", [aiohttp.ClientConnectionError("reset"), asyncio.TimeoutError()])
+    async def test_connection_failure_raises(self, gateway, error):
+        gateway.session = FakeSession(error=error)
+
+        with pytest.raises(StackAITransientError) as raised:
+            await gateway.complete(model=MODEL, prompt="p", raise_on_transient=True)
+
+        assert raised.value.status is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("session", [
+        FakeSession(status=503, body="busy"),
+        FakeSession(error=aiohttp.ClientConnectionError("reset")),
+        FakeSession(error=asyncio.TimeoutError()),
+    ])
+    async def test_falls_back_by_default(self, gateway, session):
+        gateway.session = session
+
+        assert await gateway.complete(model=MODEL, prompt="p") == FALLBACK
+
+
+class TestFallback:
+    """The synchronous OpenAI fallback runs on a worker thread"""
+
+    @pytest.mark.asyncio
+    async def test_fallback_off_event_loop(self, gateway, monkeypatch):
+        threads = []
+
+        def fallback_response(model, prompt):
+            threads.append(threading.get_ident())
+            return "fallback"
+
+        monkeypatch.setattr(gateway, "_fallback_response", fallback_response)
+        gateway.session = FakeSession(status=503, body="busy")
+
+        assert await gateway.complete(model=MODEL, prompt="p") == "fallback"
+        assert await gateway.complete(model="unrouted/model", prompt="p") == "fallback"
+        assert len(threads) == 2
+        assert threading.get_ident() not in threads
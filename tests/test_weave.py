@@ -5,11 +5,11 @@ Quick test script for Weave integration
 
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import asyncio
 import numpy as np
-from orchestrator import AnomalyOrchestrator, AnomalyContext
+from src.orchestrator import AnomalyOrchestrator, AnomalyContext
 
 async def test_weave():
     print("="*60)
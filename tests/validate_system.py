@@ -11,12 +11,12 @@ from pathlib import Path
 import numpy as np
 from datetime import datetime
 
-# Add src to path
+# Add repository root to path (modules import as src.*)
 import sys
-sys.path.insert(0, str(Path(__file__).parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from orchestrator import AnomalyOrchestrator, AnomalyContext
-from evaluation.anomaly_evaluator import AnomalyDetectionEvaluator, evaluate_all_scenarios
+from src.orchestrator import AnomalyOrchestrator, AnomalyContext
+from src.evaluation.anomaly_evaluator import AnomalyDetectionEvaluator, evaluate_all_scenarios
 
 
 DEMO_DIR = Path(__file__).parent / "demo"